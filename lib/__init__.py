@@ -1,6 +1,5 @@
 """WLED NodeServer Library"""
 
-from .wled_api import WLEDApi, WLEDDevice as WLEDApiDevice, WLEDDiscovery
-
-__all__ = ['WLEDApi', 'WLEDApiDevice', 'WLEDDiscovery']
+from .wled_api import WLEDApi, WLEDDevice as WLEDApiDevice, WLEDAsyncDevice, WLEDDiscovery
 
+__all__ = ['WLEDApi', 'WLEDApiDevice', 'WLEDAsyncDevice', 'WLEDDiscovery']
@@ -8,10 +8,20 @@ API Documentation: https://kno.wled.ge/interfaces/json-api/
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import asyncio
+import functools
+import hashlib
+import json
 import logging
+import random
 import socket
-from typing import Optional, Dict, List, Any, Tuple
-from dataclasses import dataclass, field
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional, Dict, List, Any, Tuple, Iterable, Callable
+from dataclasses import dataclass, field, replace
 
 try:
     import udi_interface
@@ -19,8 +29,163 @@ try:
 except ImportError:
     LOGGER = logging.getLogger(__name__)
 
+# orjson parses bytes directly and is several times faster than the stdlib
+# decoder on WLED's /json payloads; fall back to json if it isn't installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# aiohttp powers the WebSocket feed and WLEDAsyncDevice; the sync client
+# works without it
+try:
+    import aiohttp
+    from yarl import URL  # aiohttp dependency
+except ImportError:
+    aiohttp = None
+
+# Slotted dataclasses (Python 3.10+) drop the per-instance __dict__, which
+# matters because every poll builds a WLEDState plus one WLEDSegment per segment.
+# They are deliberately not frozen: a frozen __init__ sets every field through
+# object.__setattr__ and constructs several times slower. Treat instances as
+# immutable anyway - cached ones are shared, so update via dataclasses.replace()
+_DATACLASS_OPTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# set_state keys that map 1:1 onto WLEDState fields
+_SCALAR_STATE_FIELDS = {'on': 'on', 'bri': 'brightness', 'transition': 'transition'}
+
+# set_state 'seg' entry keys that map 1:1 onto WLEDSegment fields
+_SEGMENT_FIELDS = {
+    'on': 'on', 'bri': 'brightness', 'fx': 'effect', 'sx': 'speed',
+    'ix': 'intensity', 'pal': 'palette', 'col': 'colors',
+}
+
+# Shared read-only default for missing sub-objects while parsing
+_EMPTY: Dict[str, Any] = {}
+
+# Returned by WLEDDevice._request when a conditional GET is unchanged
+_NOT_MODIFIED = object()
+
+@functools.lru_cache(maxsize=512)
+def _parse_fxdata_entry(data: str) -> Tuple[bool, bool, bool, bool]:
+    """
+    Parse one fxdata string into (uses_palette, is_2d, volume, frequency).
+    
+    Format is "params;colors;palette;flags;options" - a '!' in the palette
+    section means the effect uses the palette, and flags look like "01",
+    "2", "01v", "2f". Cached because fxdata only changes with firmware.
+    """
+    parts = data.split(';', 4)
+    uses_palette = len(parts) > 2 and '!' in parts[2]
+    flags = parts[3].lower() if len(parts) > 3 else ''
+    return uses_palette, '2' in flags, 'v' in flags, 'f' in flags
+
+
+@functools.lru_cache(maxsize=1)
+def _get_local_ip_cached() -> Optional[str]:
+    """Get the local IP address; cached since it rarely changes in a process"""
+    try:
+        # UDP connect sends no packets - the kernel just picks the source
+        # address from the routing table - so a short timeout is safe
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            s.settimeout(0.5)
+            s.connect(("8.8.8.8", 80))
+            return s.getsockname()[0]
+    except Exception as e:
+        LOGGER.debug(f"Route lookup for local IP failed: {e}")
+    
+    # Fallback: resolve our own hostname (no default route configured)
+    try:
+        ip = socket.gethostbyname(socket.gethostname())
+        if not ip.startswith('127.'):
+            return ip
+    except Exception as e:
+        LOGGER.debug(f"Hostname lookup for local IP failed: {e}")
+    
+    LOGGER.error("Failed to get local IP")
+    return None
+
+
+def _merge_state(pending: Dict[str, Any], update: Dict[str, Any]):
+    """
+    Merge a set_state update into a pending one, in place.
+    
+    Later values win; 'seg' entries are merged per segment id. WLED
+    applies an entry without an id to the segment at its list position,
+    so merged entries are given that id explicitly.
+    """
+    for key, value in update.items():
+        if key != 'seg':
+            pending[key] = value
+            continue
+        
+        segments = pending.setdefault('seg', [])
+        by_id = {seg['id']: seg for seg in segments}
+        for index, seg in enumerate(value):
+            seg_id = seg.get('id', index)
+            existing = by_id.get(seg_id)
+            if existing is None:
+                by_id[seg_id] = existing = {'id': seg_id}
+                segments.append(existing)
+            existing.update(seg)
+
+
+def _keepalive_session(pool_connections: int) -> requests.Session:
+    """Create a keep-alive requests.Session pooling up to 4 connections per host"""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=pool_connections, pool_maxsize=4, max_retries=0))
+    session.headers['Connection'] = 'keep-alive'
+    return session
+
 
-@dataclass
+# Discovery probes give up on /json/info bodies larger than this
+_PROBE_MAX_BYTES = 64 * 1024
+
+# Discovery probe URL, formatted with the IP
+_PROBE_URL = "http://%s/json/info"
+
+
+def _sat8(value: int) -> int:
+    """Clamp a channel/brightness value to 0-255"""
+    return 0 if value < 0 else 255 if value > 255 else value
+
+
+# One event loop, on one daemon thread, runs every coroutine the module
+# needs (WebSocket listeners, WLEDAsyncDevice I/O) instead of a thread each
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+_loop_factory: Callable[[], asyncio.AbstractEventLoop] = asyncio.new_event_loop
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Get the shared event loop, starting its thread on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = _loop_factory()
+            threading.Thread(target=_loop.run_forever, name="wled-asyncio", daemon=True).start()
+        return _loop
+
+
+def run_coroutine(coro, timeout: Optional[float] = None) -> Any:
+    """
+    Run a coroutine on the shared event loop and wait for its result.
+    
+    Lets synchronous PG3 code drive the async API, e.g.
+    run_coroutine(api.poll_all()).
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result(timeout)
+
+
+@dataclass(**_DATACLASS_OPTS)
 class WLEDSegment:
     """Represents a WLED segment"""
     id: int
@@ -38,22 +203,28 @@ class WLEDSegment:
     @classmethod
     def from_json(cls, data: Dict[str, Any], seg_id: int) -> 'WLEDSegment':
         """Create segment from JSON API response"""
+        get = data.get
+        start = get('start', 0)
+        stop = get('stop', 0)
+        length = get('len')
+        colors = get('col')  # default only built when missing
+        
         return cls(
-            id=seg_id,
-            start=data.get('start', 0),
-            stop=data.get('stop', 0),
-            length=data.get('len', data.get('stop', 0) - data.get('start', 0)),
-            on=data.get('on', True),
-            brightness=data.get('bri', 255),
-            effect=data.get('fx', 0),
-            speed=data.get('sx', 128),
-            intensity=data.get('ix', 128),
-            palette=data.get('pal', 0),
-            colors=data.get('col', [[255, 255, 255]])
+            seg_id,
+            start,
+            stop,
+            stop - start if length is None else length,
+            get('on', True),
+            get('bri', 255),
+            get('fx', 0),
+            get('sx', 128),
+            get('ix', 128),
+            get('pal', 0),
+            [[255, 255, 255]] if colors is None else colors
         )
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTS)
 class WLEDState:
     """Represents the current state of a WLED device"""
     on: bool = False
@@ -70,59 +241,63 @@ class WLEDState:
     sync_receive: bool = True
     main_segment: int = 0
     segments: List[WLEDSegment] = field(default_factory=list)
+    # Main segment, resolved once per instance (replace() re-runs __post_init__)
+    _main: Optional[WLEDSegment] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        segments = self.segments
+        main = self.main_segment
+        self._main = segments[main] if 0 <= main < len(segments) else None
     
     @classmethod
     def from_json(cls, data: Dict[str, Any]) -> 'WLEDState':
         """Create state from JSON API response"""
-        segments = []
-        for i, seg_data in enumerate(data.get('seg', [])):
-            segments.append(WLEDSegment.from_json(seg_data, i))
-        
-        nl = data.get('nl', {})
-        udpn = data.get('udpn', {})
+        get = data.get
+        seg_from_json = WLEDSegment.from_json
+        segments = [seg_from_json(seg_data, i) for i, seg_data in enumerate(get('seg') or ())]
+        nl = get('nl') or _EMPTY
+        udpn = get('udpn') or _EMPTY
         
+        # Positional in field order - skips keyword matching per field
         return cls(
-            on=data.get('on', False),
-            brightness=data.get('bri', 0),
-            transition=data.get('transition', 7),
-            preset=data.get('ps', -1),
-            playlist=data.get('pl', -1),
-            nightlight_on=nl.get('on', False),
-            nightlight_duration=nl.get('dur', 60),
-            nightlight_mode=nl.get('mode', 0),
-            nightlight_brightness=nl.get('tbri', 0),
-            live=data.get('lor', 0) > 0,
-            sync_send=udpn.get('send', False),
-            sync_receive=udpn.get('recv', True),
-            main_segment=data.get('mainseg', 0),
-            segments=segments
+            get('on', False),
+            get('bri', 0),
+            get('transition', 7),
+            get('ps', -1),
+            get('pl', -1),
+            nl.get('on', False),
+            nl.get('dur', 60),
+            nl.get('mode', 0),
+            nl.get('tbri', 0),
+            get('lor', 0) > 0,
+            udpn.get('send', False),
+            udpn.get('recv', True),
+            get('mainseg', 0),
+            segments
         )
     
     @property
     def primary_color(self) -> List[int]:
         """Get primary color from main segment"""
-        if self.segments and len(self.segments) > self.main_segment:
-            seg = self.segments[self.main_segment]
-            if seg.colors and len(seg.colors) > 0:
-                return seg.colors[0]
+        main = self._main
+        if main is not None and main.colors:
+            return main.colors[0]
         return [255, 255, 255]
     
     @property
     def effect(self) -> int:
         """Get effect from main segment"""
-        if self.segments and len(self.segments) > self.main_segment:
-            return self.segments[self.main_segment].effect
-        return 0
+        main = self._main
+        return main.effect if main is not None else 0
     
     @property
     def palette(self) -> int:
         """Get palette from main segment"""
-        if self.segments and len(self.segments) > self.main_segment:
-            return self.segments[self.main_segment].palette
-        return 0
+        main = self._main
+        return main.palette if main is not None else 0
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTS)
 class WLEDInfo:
     """Represents WLED device information"""
     version: str = ""
@@ -137,34 +312,39 @@ class WLEDInfo:
     brand: str = "wled"
     mac: str = ""
     ip: str = ""
+    presets_modified: int = 0  # presets.json modification time (fs.pmt)
     
     @classmethod
     def from_json(cls, data: Dict[str, Any]) -> 'WLEDInfo':
         """Create info from JSON API response"""
-        leds = data.get('leds', {})
+        get = data.get
+        leds = get('leds') or _EMPTY
+        lip = get('lip')
         
+        # Positional in field order - skips keyword matching per field
         return cls(
-            version=data.get('ver', ''),
-            version_id=data.get('vid', 0),
-            led_count=leds.get('count', 0),
-            max_segments=leds.get('maxseg', 0),
-            name=data.get('name', ''),
-            udp_port=data.get('udpport', 21324),
-            live_support=data.get('lm', False) if isinstance(data.get('lm'), bool) else bool(data.get('lm', 0)),
-            live_mode=data.get('lip', 0) if isinstance(data.get('lip'), int) else 0,
-            product=data.get('product', 'WLED'),
-            brand=data.get('brand', 'wled'),
-            mac=data.get('mac', ''),
-            ip=data.get('ip', '')
+            get('ver', ''),
+            get('vid', 0),
+            leds.get('count', 0),
+            leds.get('maxseg', 0),
+            get('name', ''),
+            get('udpport', 21324),
+            bool(get('lm')),
+            lip if isinstance(lip, int) else 0,
+            get('product', 'WLED'),
+            get('brand', 'wled'),
+            get('mac', ''),
+            get('ip', ''),
+            (get('fs') or _EMPTY).get('pmt', 0)
         )
 
 
-class WLEDDevice:
+class _WLEDDeviceBase:
     """
-    WLED Device API Client
+    Endpoint URLs and cached data shared by the sync and async clients.
     
-    Handles all communication with a single WLED device via the JSON API.
-    Uses synchronous requests for compatibility with PG3.
+    Subclasses do the I/O and hand decoded responses to the _apply_*
+    methods, so both clients keep their caches the same way.
     """
     
     def __init__(self, host: str, port: int = 80, timeout: int = 5):
@@ -181,12 +361,31 @@ class WLEDDevice:
         self.timeout = timeout
         self._base_url = f"http://{host}:{port}"
         
+        # Pre-built URLs for the API endpoints used on every poll/set
+        self._url_json = self._base_url + "/json"
+        self._url_state = self._base_url + "/json/state"
+        self._url_info = self._base_url + "/json/info"
+        self._url_effects = self._base_url + "/json/effects"
+        self._url_fxdata = self._base_url + "/json/fxdata"
+        self._url_presets = self._base_url + "/presets.json"
+        # What /json combines, for firmware that doesn't serve it (see get_all)
+        self._url_parts = (self._url_state, self._url_info, self._url_effects,
+                           self._base_url + "/json/palettes")
+        
         # Cached data
         self._state: Optional[WLEDState] = None
         self._info: Optional[WLEDInfo] = None
-        self._effects: List[str] = []
-        self._palettes: List[str] = []
+        self._effects: Tuple[str, ...] = ()
+        self._effect_index: Dict[str, int] = {}  # effect name -> effect ID
+        self._effect_names: Optional[List[str]] = None  # unfiltered, indexed by effect ID
+        self._effect_metadata: Optional[Tuple[int, Dict[int, Dict[str, Any]]]] = None  # (version_id, metadata)
+        self._palettes: Tuple[str, ...] = ()
+        self._palette_names: Optional[List[str]] = None  # unfiltered, as last received
         self._presets: Dict[int, str] = {}
+        self._presets_pmt: Optional[int] = None  # info.presets_modified at last presets fetch
+        self._lists_vid: Optional[int] = None  # info.version_id when effects/palettes were parsed
+        self._last_full_fetch = 0.0  # time.monotonic() of the last /json parse
+        self.full_ttl = 1.0  # seconds get_state/get_info reuse a /json fetch for
         
         # Connection status
         self._online = False
@@ -208,74 +407,387 @@ class WLEDDevice:
         return self._info
     
     @property
-    def effects(self) -> List[str]:
-        """Get cached effects list"""
+    def effects(self) -> Tuple[str, ...]:
+        """Get cached effect names (reserved/unnamed slots removed)"""
         return self._effects
     
     @property
-    def palettes(self) -> List[str]:
-        """Get cached palettes list"""
+    def palettes(self) -> Tuple[str, ...]:
+        """Get cached palette names (reserved/unnamed slots removed)"""
         return self._palettes
     
+    def effect_id(self, name: str) -> Optional[int]:
+        """Look up an effect ID by name"""
+        return self._effect_index.get(name)
+    
     @property
     def presets(self) -> Dict[int, str]:
         """Get cached presets"""
         return self._presets
     
-    def _request(self, method: str, endpoint: str, 
-                 json_data: Optional[Dict] = None) -> Optional[Dict]:
+    def _presets_stale(self) -> bool:
+        """Check if presets were never fetched or changed on the device since"""
+        pmt = self._info.presets_modified if self._info else 0
+        return self._presets_pmt is None or not pmt or pmt != self._presets_pmt
+    
+    def _full_fetch_fresh(self) -> bool:
+        """Check if the last /json fetch is recent enough to answer get_state/get_info"""
+        return time.monotonic() - self._last_full_fetch < self.full_ttl
+    
+    def _state_is_live(self) -> bool:
+        """Check if the cached state can be trusted to match the device right now"""
+        return self._full_fetch_fresh()
+    
+    def _apply_all(self, data: Dict[str, Any]):
+        """Update the cache from a decoded /json response"""
+        if 'state' in data and 'info' in data:
+            self._last_full_fetch = time.monotonic()
+        
+        # Parse state
+        if 'state' in data:
+            self._state = WLEDState.from_json(data['state'])
+        
+        # Parse info
+        if 'info' in data:
+            self._info = WLEDInfo.from_json(data['info'])
+        
+        # Effect and palette names only change with the firmware, so
+        # skip re-filtering them unless the build id has changed
+        vid = self._info.version_id if self._info else None
+        if not self._effects or not self._palettes or not vid or vid != self._lists_vid:
+            # Without a build id to go on, an unchanged list (a single C-level
+            # compare) still avoids rebuilding the filtered copies
+            effects = data.get('effects')
+            if effects is not None and effects != self._effect_names:
+                self._effect_names = effects
+                self._effects = tuple(e for e in effects if e and e != '-')
+                self._effect_index = {e: i for i, e in enumerate(effects) if e and e != '-'}
+            
+            palettes = data.get('palettes')
+            if palettes is not None and palettes != self._palette_names:
+                self._palette_names = palettes
+                self._palettes = tuple(p for p in palettes if p and p != '-')
+            
+            self._lists_vid = vid
+    
+    def _apply_parts(self, parts: List[Any]) -> bool:
+        """Apply /json/state, /json/info, /json/effects and /json/palettes bodies"""
+        data = {key: value for key, value in zip(('state', 'info', 'effects', 'palettes'), parts)
+                if value is not None}
+        if 'state' not in data:
+            return False
+        self._apply_all(data)
+        return True
+    
+    def _state_payload(self, kwargs: Dict[str, Any],
+                       parse_response: bool = True) -> Tuple[Dict[str, Any], bool]:
+        """
+        Build the POST body for set_state.
+        
+        Changes that map directly onto cached fields - power, brightness,
+        transition, and effect/palette/colour/speed/intensity of existing
+        segments - are sent as-is and applied to the cached state. Anything
+        else asks WLED to echo the full new state ("v": true) so it can be
+        re-parsed, unless parse_response is False.
+        
+        Returns:
+            (payload, fast_path)
+        """
+        fast_path = self._state is not None and self._is_local_change(kwargs)
+        if fast_path or not parse_response:
+            return kwargs, fast_path
+        return {**kwargs, 'v': True}, fast_path
+    
+    def _is_local_change(self, kwargs: Dict[str, Any]) -> bool:
+        """Check if a set_state change can be applied to the cache without an echo"""
+        # bri=0 also switches the device (or segment) off, so let WLED report
+        # the result; bri > 0 switches it on, which _apply_state_reply mirrors
+        if kwargs.get('bri') == 0:
+            return False
+        
+        for key in kwargs:
+            if key != 'seg' and key not in _SCALAR_STATE_FIELDS:
+                return False
+        
+        segments = kwargs.get('seg')
+        if segments is None:
+            return True
+        if not isinstance(segments, list):
+            return False
+        
+        count = len(self._state.segments)
+        for index, seg in enumerate(segments):
+            if seg.get('bri') == 0 or not 0 <= seg.get('id', index) < count:
+                return False
+            for key in seg:
+                if key != 'id' and key not in _SEGMENT_FIELDS:
+                    return False
+        return True
+    
+    def _is_noop(self, kwargs: Dict[str, Any]) -> bool:
+        """Check if a set_state change would leave the (live) cached state unchanged"""
+        state = self._state
+        if state is None or not self._state_is_live() or not self._is_local_change(kwargs):
+            return False
+        
+        # WLED keeps reporting the last brightness while off, and a bri write
+        # is what turns it back on - so that is never a no-op on its own
+        if 'bri' in kwargs and 'on' not in kwargs and not state.on:
+            return False
+        
+        for key, value in kwargs.items():
+            if key != 'seg' and getattr(state, _SCALAR_STATE_FIELDS[key]) != value:
+                return False
+        
+        for index, seg in enumerate(kwargs.get('seg', ())):
+            current = state.segments[seg.get('id', index)]
+            if 'bri' in seg and 'on' not in seg and not current.on:
+                return False
+            for key, value in seg.items():
+                if key == 'id':
+                    continue
+                if key == 'col':
+                    # Only the sent slots matter; an RGB strip reports 3 channels
+                    # where we send 4, which simply never counts as a no-op
+                    if current.colors[:len(value)] != value:
+                        return False
+                elif getattr(current, _SEGMENT_FIELDS[key]) != value:
+                    return False
+        return True
+    
+    def _apply_state_reply(self, kwargs: Dict[str, Any], fast_path: bool, data: Dict[str, Any]):
+        """Update the cached state after a successful set_state POST"""
+        if fast_path:
+            changes = {_SCALAR_STATE_FIELDS[key]: value
+                       for key, value in kwargs.items() if key != 'seg'}
+            # WLED turns the device (and a segment, for seg bri) on for any
+            # bri > 0; bri=0 never takes the fast path
+            if 'bri' in kwargs and 'on' not in kwargs:
+                changes['on'] = True
+            
+            if 'seg' in kwargs:
+                segments = list(self._state.segments)
+                for index, seg in enumerate(kwargs['seg']):
+                    seg_id = seg.get('id', index)
+                    current = segments[seg_id]
+                    updates = {_SEGMENT_FIELDS[key]: value
+                               for key, value in seg.items() if key != 'id'}
+                    if 'bri' in seg and 'on' not in seg:
+                        updates['on'] = True
+                    if 'colors' in updates:
+                        # WLED only replaces the colour slots that were sent
+                        colors = list(updates['colors'])
+                        updates['colors'] = colors + current.colors[len(colors):]
+                    segments[seg_id] = replace(current, **updates)
+                changes['segments'] = segments
+            
+            self._state = replace(self._state, **changes)
+        elif 'on' in data or 'seg' in data:
+            self._state = WLEDState.from_json(data)
+    
+    def _apply_presets(self, items: Iterable[Tuple[str, str]]) -> Dict[int, str]:
+        """Cache (preset key, name) pairs, skipping non-numeric keys"""
+        # JSON object keys are always str; isdecimal() is exactly what int() accepts
+        presets = {int(key): name for key, name in items if key.isdecimal()}
+        self._presets = presets
+        self._presets_pmt = self._info.presets_modified if self._info else 0
+        LOGGER.info(f"WLED {self.host}: Found {len(presets)} presets")
+        return presets
+
+
+class WLEDDevice(_WLEDDeviceBase):
+    """
+    WLED Device API Client
+    
+    Handles all communication with a single WLED device via the JSON API.
+    Uses synchronous requests for compatibility with PG3.
+    """
+    
+    def __init__(self, host: str, port: int = 80, timeout: int = 5,
+                 session: Optional[requests.Session] = None):
+        """
+        Initialize WLED device client.
+        
+        Args:
+            host: IP address or hostname of WLED device
+            port: HTTP port (default 80)
+            timeout: Request timeout in seconds
+            session: Shared requests.Session (WLEDApi passes its own);
+                one is created for this device if omitted
+        """
+        super().__init__(host, port, timeout)
+        
+        # Persistent HTTP session - keeps the TCP connection to the device
+        # alive between polls instead of reconnecting on every request
+        self._owns_session = session is None
+        self._session = session if session is not None else _keepalive_session(pool_connections=1)
+        
+        # Validators for conditional GETs - (url, ETag) and
+        # (url, body digest) of the last response that was parsed
+        self._etag: Optional[Tuple[str, str]] = None
+        self._body_digest: Optional[Tuple[str, bytes]] = None
+        # Parsed objects keyed by (url, validator) - see _request(parser=...)
+        self._parse_cache: Dict[Tuple[str, Any], Any] = {}
+        
+        # WebSocket push feed (see start_ws) - runs on the shared loop
+        self._ws_future: Optional[Any] = None
+        self._ws_stop = threading.Event()
+        self._ws_connected = False
+        # Called (from the loop or batch timer thread) after each pushed or
+        # batch_window update is applied
+        self.on_update: Optional[Callable[[], None]] = None
+        
+        # Background state polling (see start_polling) - also on the shared loop
+        self._poll_future: Optional[Any] = None
+        
+        # Write coalescing (see begin_batch / batch_window)
+        self.batch_window = 0.0  # seconds to hold set_state calls; 0 sends at once
+        self._pending: Dict[str, Any] = {}
+        self._batch_depth = 0
+        self._batch_timer: Optional[threading.Timer] = None
+        self._batch_lock = threading.Lock()
+    
+    def _request(self, method: str, url: str, 
+                 json_data: Optional[Dict] = None,
+                 conditional: bool = False,
+                 parser: Optional[Callable[[Dict], Any]] = None) -> Any:
         """
         Make HTTP request to WLED device.
         
         Args:
             method: HTTP method (GET, POST)
-            endpoint: API endpoint (e.g., /json/state)
+            url: Full request URL (one of the pre-built self._url_* values)
             json_data: JSON data for POST requests
+            conditional: For GETs, return _NOT_MODIFIED instead of the
+                decoded body when it is unchanged since the last call
+            parser: For conditional GETs, build the result with this and
+                reuse it when the same body comes back later
             
         Returns:
-            JSON response or None on error
+            JSON response (or parsed object), _NOT_MODIFIED, or None on error
         """
-        url = f"{self._base_url}{endpoint}"
-        
         try:
             if method == "GET":
-                response = requests.get(url, timeout=self.timeout)
+                headers = None
+                if conditional and self._etag and self._etag[0] == url:
+                    headers = {'If-None-Match': self._etag[1]}
+                response = self._session.get(url, timeout=self.timeout, headers=headers)
             elif method == "POST":
-                response = requests.post(url, json=json_data, timeout=self.timeout)
+                response = self._session.post(url, data=_json_dumps(json_data),
+                                              headers=_JSON_HEADERS, timeout=self.timeout)
             else:
-                LOGGER.error(f"WLED {self.host}: Unknown method {method}")
+                LOGGER.error("WLED %s: Unknown method %s", self.host, method)
                 return None
             
+            if response.status_code == 304 and conditional:
+                self._online = True
+                self._last_error = None
+                return _NOT_MODIFIED
+            
             if response.status_code == 200:
                 self._online = True
                 self._last_error = None
-                return response.json()
+                
+                if method == "POST":
+                    # Device state changed - don't trust earlier validators
+                    self._invalidate_validators()
+                elif conditional and self._is_unchanged(url, response):
+                    return _NOT_MODIFIED
+                
+                if parser is not None and conditional:
+                    return self._parse_cached(url, response, parser)
+                
+                return _json_loads(response.content)
             else:
                 self._last_error = f"HTTP {response.status_code}"
-                LOGGER.warning(f"WLED {self.host}: HTTP {response.status_code} on {endpoint}")
+                LOGGER.warning("WLED %s: HTTP %d on %s", self.host, response.status_code, url)
                 
         except requests.exceptions.Timeout:
             self._online = False
             self._last_error = "Timeout"
-            LOGGER.warning(f"WLED {self.host}: Request timeout")
+            LOGGER.warning("WLED %s: Request timeout", self.host)
             
         except requests.exceptions.ConnectionError as e:
             self._online = False
             self._last_error = "Connection error"
-            LOGGER.warning(f"WLED {self.host}: Connection error - {e}")
+            LOGGER.warning("WLED %s: Connection error - %s", self.host, e)
             
         except requests.exceptions.RequestException as e:
             self._online = False
             self._last_error = str(e)
-            LOGGER.error(f"WLED {self.host}: Request error - {e}")
+            LOGGER.error("WLED %s: Request error - %s", self.host, e)
             
         except Exception as e:
             self._online = False
             self._last_error = str(e)
-            LOGGER.error(f"WLED {self.host}: Unexpected error - {e}")
+            LOGGER.error("WLED %s: Unexpected error - %s", self.host, e)
             
         return None
     
+    def _is_unchanged(self, url: str, response) -> bool:
+        """
+        Check a GET response against the validator from the previous one.
+        
+        Uses the ETag when the device sends one, otherwise a short blake2b
+        digest of the body, which is far cheaper than decoding and parsing
+        it again. Records the new validator for the next call.
+        """
+        etag = response.headers.get('ETag')
+        if etag:
+            self._etag = (url, etag)
+            return False
+        
+        digest = hashlib.blake2b(response.content, digest_size=8).digest()
+        if self._body_digest == (url, digest):
+            return True
+        self._body_digest = (url, digest)
+        return False
+    
+    def _parse_cached(self, url: str, response, parser: Callable[[Dict], Any]) -> Any:
+        """
+        Parse a response body, reusing the result for a previously seen body.
+        
+        Idle devices flip between a handful of bodies (e.g. before and after
+        a setter), so two entries are enough. Cached objects are shared -
+        callers must replace them rather than mutate them.
+        """
+        cache = self._parse_cache
+        etag = response.headers.get('ETag')
+        key = (url, etag if etag else self._body_digest[1])
+        
+        parsed = cache.pop(key, None)
+        if parsed is None:
+            parsed = parser(_json_loads(response.content))
+            if len(cache) >= 2:
+                del cache[next(iter(cache))]
+        cache[key] = parsed
+        return parsed
+    
+    def _invalidate_validators(self):
+        """Forget conditional GET validators so the next poll is parsed"""
+        self._etag = None
+        self._body_digest = None
+    
+    def refresh(self, include_presets: bool = False) -> bool:
+        """
+        Refresh state, info, effects and palettes with a single /json fetch.
+        
+        Args:
+            include_presets: Also refresh presets - /presets.json is only
+                re-read when the device reports it changed since the last
+                fetch (info.fs.pmt), or if it has never been fetched
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.get_all():
+            return False
+        
+        if include_presets and self._presets_stale():
+            self.get_presets()
+        
+        return True
+    
     def get_all(self) -> bool:
         """
         Fetch all data from device (state, info, effects, palettes).
@@ -283,40 +795,89 @@ class WLEDDevice:
         Returns:
             True if successful, False otherwise
         """
-        data = self._request("GET", "/json")
+        data = self._request("GET", self._url_json, conditional=True)
+        
+        if data is _NOT_MODIFIED:
+            self._last_full_fetch = time.monotonic()
+            return True
         
         if data:
-            # Parse state
-            if 'state' in data:
-                self._state = WLEDState.from_json(data['state'])
-            
-            # Parse info
-            if 'info' in data:
-                self._info = WLEDInfo.from_json(data['info'])
-            
-            # Parse effects
-            if 'effects' in data:
-                self._effects = [e for e in data['effects'] if e and e != '-']
-            
-            # Parse palettes
-            if 'palettes' in data:
-                self._palettes = [p for p in data['palettes'] if p and p != '-']
-            
+            self._apply_all(data)
             return True
         
+        if self._last_error == "HTTP 404":
+            # Firmware without /json - fetch its parts instead
+            return self._fetch_parts()
+        
         return False
     
+    def _fetch_parts(self) -> bool:
+        """
+        Fetch state, info, effects and palettes from their own endpoints.
+        
+        With aiohttp the four GETs run concurrently on the shared loop, so
+        this costs about one round trip rather than four.
+        """
+        if aiohttp is None:
+            return self._apply_parts([self._request("GET", url) for url in self._url_parts])
+        
+        try:
+            parts = run_coroutine(self._fetch_parts_async(), self.timeout + 1.0)
+        except Exception as e:
+            LOGGER.warning("WLED %s: Fallback fetch failed - %s", self.host, e)
+            return False
+        
+        if parts[0] is not None:
+            self._online = True
+            self._last_error = None
+        return self._apply_parts(parts)
+    
+    async def _fetch_parts_async(self) -> List[Any]:
+        """GET self._url_parts concurrently; failed parts come back as None"""
+        async def fetch(url):
+            try:
+                async with session.get(url) as response:
+                    if response.status == 200:
+                        return _json_loads(await response.read())
+            except Exception as e:
+                LOGGER.debug("WLED %s: Fallback GET %s failed - %s", self.host, url, e)
+            return None
+        
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            return await asyncio.gather(*(fetch(url) for url in self._url_parts))
+    
+    @property
+    def ws_connected(self) -> bool:
+        """Check if the WebSocket state feed is connected"""
+        return self._ws_connected
+    
+    def _state_is_live(self) -> bool:
+        """Check if the cached state can be trusted to match the device right now"""
+        return self._ws_connected or self._full_fetch_fresh()
+    
     def get_state(self) -> Optional[WLEDState]:
         """
         Fetch current state from device.
         
+        When the WebSocket feed is connected, or get_all ran within the
+        last full_ttl seconds, the cached state is already current, so no
+        HTTP request is made.
+        
         Returns:
             WLEDState or None on error
         """
-        data = self._request("GET", "/json/state")
+        if self._state and self._state_is_live():
+            return self._state
         
-        if data:
-            self._state = WLEDState.from_json(data)
+        state = self._request("GET", self._url_state, conditional=True,
+                              parser=WLEDState.from_json)
+        
+        if state is _NOT_MODIFIED:
+            return self._state
+        
+        if state:
+            self._state = state
             return self._state
         
         return None
@@ -328,7 +889,13 @@ class WLEDDevice:
         Returns:
             WLEDInfo or None on error
         """
-        data = self._request("GET", "/json/info")
+        if self._info and self._state_is_live():
+            return self._info
+        
+        data = self._request("GET", self._url_info, conditional=True)
+        
+        if data is _NOT_MODIFIED:
+            return self._info
         
         if data:
             self._info = WLEDInfo.from_json(data)
@@ -336,38 +903,119 @@ class WLEDDevice:
         
         return None
     
-    def set_state(self, **kwargs) -> bool:
+    def set_state(self, parse_response: bool = True, **kwargs) -> bool:
         """
         Set device state.
         
         Args:
+            parse_response: Ask WLED for the resulting state and re-parse
+                it when the change can't be applied to the cache locally.
+                Pass False for fire-and-forget writes; the cached state
+                then stays as it was until the next poll.
             on: Power state (True/False)
             bri: Brightness (0-255)
             transition: Transition time in 100ms units
             ps: Preset to load (-1 for none)
             seg: Segment settings (list of dicts)
             
+        Changes to power, brightness, transition and existing segments'
+        fx/pal/col/sx/ix are applied to the cached state directly, keeping
+        the request and reply minimal. Anything else asks WLED to echo the
+        full new state ("v": true) and re-parses it.
+        
+        Inside a batch, or when batch_window is set, the change is merged
+        into one pending POST instead of being sent straight away.
+        
         Returns:
-            True if successful
+            True if successful (or queued)
         """
-        data = self._request("POST", "/json/state", kwargs)
+        if self._batch_depth or self.batch_window > 0:
+            with self._batch_lock:
+                _merge_state(self._pending, kwargs)
+                if not self._batch_depth and self._batch_timer is None:
+                    self._batch_timer = threading.Timer(self.batch_window, self._flush_window)
+                    self._batch_timer.daemon = True
+                    self._batch_timer.start()
+            return True
+        
+        return self._send_state(kwargs, parse_response)
+    
+    def _send_state(self, kwargs: Dict[str, Any], parse_response: bool = True) -> bool:
+        """POST a state change and update the cached state from the reply"""
+        if self._is_noop(kwargs):
+            return True
+        
+        payload, fast_path = self._state_payload(kwargs, parse_response)
+        data = self._request("POST", self._url_state, payload)
         
         if data:
-            # Update cached state
-            self._state = WLEDState.from_json(data)
+            self._apply_state_reply(kwargs, fast_path, data)
             return True
         
         return False
     
+    def begin_batch(self):
+        """Hold set_state calls until the matching commit_batch (can nest)"""
+        with self._batch_lock:
+            self._batch_depth += 1
+    
+    def commit_batch(self) -> bool:
+        """
+        Close a batch opened with begin_batch, sending the merged changes
+        as a single POST once the outermost batch closes.
+        
+        Returns:
+            True if successful (or nothing to send yet)
+        """
+        with self._batch_lock:
+            self._batch_depth = max(self._batch_depth - 1, 0)
+            if self._batch_depth:
+                return True
+        return self._flush_pending()
+    
+    @contextmanager
+    def batch(self):
+        """Context manager form of begin_batch/commit_batch"""
+        self.begin_batch()
+        try:
+            yield self
+        finally:
+            self.commit_batch()
+    
+    def _flush_pending(self) -> bool:
+        """Send the pending merged state change, if any"""
+        with self._batch_lock:
+            pending, self._pending = self._pending, {}
+            if self._batch_timer is not None:
+                self._batch_timer.cancel()
+                self._batch_timer = None
+        
+        if not pending:
+            return True
+        return self._send_state(pending)
+    
+    def _flush_window(self):
+        """batch_window timer callback - send, then let on_update see the new state"""
+        if self._flush_pending():
+            self._notify_update()
+    
+    def _notify_update(self):
+        """Call on_update, if set, after the cached state changed in the background"""
+        if self.on_update is not None:
+            try:
+                self.on_update()
+            except Exception as e:
+                LOGGER.warning(f"WLED {self.host}: Update callback failed - {e}")
+    
     def set_power(self, on: bool) -> bool:
         """Turn device on or off"""
-        LOGGER.info(f"WLED {self.host}: Setting power to {on}")
+        LOGGER.info("WLED %s: Setting power to %s", self.host, on)
         return self.set_state(on=on)
     
     def set_brightness(self, brightness: int) -> bool:
         """Set brightness (0-255)"""
-        brightness = max(0, min(255, brightness))
-        LOGGER.info(f"WLED {self.host}: Setting brightness to {brightness}")
+        brightness = _sat8(brightness)
+        LOGGER.info("WLED %s: Setting brightness to %d", self.host, brightness)
         return self.set_state(bri=brightness)
     
     def set_effect(self, effect_id: int, speed: Optional[int] = None, 
@@ -375,31 +1023,28 @@ class WLEDDevice:
         """Set effect on main segment"""
         seg_data = {"fx": effect_id}
         if speed is not None:
-            seg_data["sx"] = max(0, min(255, speed))
+            seg_data["sx"] = _sat8(speed)
         if intensity is not None:
-            seg_data["ix"] = max(0, min(255, intensity))
+            seg_data["ix"] = _sat8(intensity)
         
-        LOGGER.info(f"WLED {self.host}: Setting effect to {effect_id}")
+        LOGGER.info("WLED %s: Setting effect to %s", self.host, effect_id)
         return self.set_state(seg=[seg_data])
     
     def set_palette(self, palette_id: int) -> bool:
         """Set palette on main segment"""
-        LOGGER.info(f"WLED {self.host}: Setting palette to {palette_id}")
+        LOGGER.info("WLED %s: Setting palette to %s", self.host, palette_id)
         return self.set_state(seg=[{"pal": palette_id}])
     
     def set_color(self, r: int, g: int, b: int, w: int = 0) -> bool:
         """Set primary color on main segment"""
-        r = max(0, min(255, r))
-        g = max(0, min(255, g))
-        b = max(0, min(255, b))
-        w = max(0, min(255, w))
+        r, g, b, w = _sat8(r), _sat8(g), _sat8(b), _sat8(w)
         
-        LOGGER.info(f"WLED {self.host}: Setting color to RGB({r},{g},{b})")
+        LOGGER.info("WLED %s: Setting color to RGB(%d,%d,%d)", self.host, r, g, b)
         return self.set_state(seg=[{"col": [[r, g, b, w]]}])
     
     def set_preset(self, preset_id: int) -> bool:
         """Load a preset"""
-        LOGGER.info(f"WLED {self.host}: Loading preset {preset_id}")
+        LOGGER.info("WLED %s: Loading preset %s", self.host, preset_id)
         return self.set_state(ps=preset_id)
     
     def get_presets(self) -> Dict[int, str]:
@@ -410,28 +1055,49 @@ class WLEDDevice:
             Dict mapping preset ID to preset name
         """
         try:
-            response = requests.get(f"{self._base_url}/presets.json", timeout=self.timeout)
-            if response.status_code == 200:
-                data = response.json()
-                presets = {}
-                for key, value in data.items():
-                    if isinstance(value, dict) and 'n' in value:
-                        try:
-                            preset_id = int(key)
-                            presets[preset_id] = value['n']
-                        except (ValueError, TypeError):
-                            pass
-                self._presets = presets
-                LOGGER.info(f"WLED {self.host}: Found {len(presets)} presets")
-                return presets
+            response = self._session.get(self._url_presets, timeout=self.timeout, stream=True)
+            try:
+                if response.status_code == 200:
+                    return self._apply_presets(self._iter_preset_names(response))
+            finally:
+                response.close()
         except Exception as e:
             LOGGER.warning(f"WLED {self.host}: Failed to get presets - {e}")
         return {}
     
+    @staticmethod
+    def _iter_preset_names(response) -> Iterable[Tuple[str, str]]:
+        """
+        Yield (preset key, name) pairs from a streamed presets.json response.
+        
+        Presets can hold full segment configs, but only the top-level 'n'
+        of each entry is needed. With ijson the body is parsed as a stream
+        and everything else is skipped without being built into objects;
+        otherwise the whole document is decoded and filtered.
+        """
+        try:
+            import ijson
+        except ImportError:
+            for key, value in _json_loads(response.content).items():
+                if isinstance(value, dict) and 'n' in value:
+                    yield key, value['n']
+            return
+        
+        response.raw.decode_content = True
+        for prefix, event, value in ijson.parse(response.raw):
+            # Only "<id>.n" - nested keys such as "<id>.seg.item.n" have more dots
+            if event == 'string' and prefix.endswith('.n') and prefix.count('.') == 1:
+                yield prefix[:-2], value
+    
     def get_effect_metadata(self) -> Dict[int, Dict[str, Any]]:
         """
         Fetch effect metadata from device (fxdata).
         
+        Effect names come from the last /json fetch when there was one, so
+        only /json/fxdata needs a round trip (/json never includes fxdata).
+        The result is kept until the firmware build (info.version_id)
+        changes.
+        
         Returns:
             Dict mapping effect ID to metadata dict with keys:
             - is_2d: bool - True if 2D effect
@@ -439,55 +1105,41 @@ class WLEDDevice:
             - volume: bool - True if volume reactive (audio)
             - frequency: bool - True if frequency reactive (audio)
         """
+        vid = self._info.version_id if self._info else 0
+        if vid and self._effect_metadata and self._effect_metadata[0] == vid:
+            return self._effect_metadata[1]
+        
         metadata = {}
         try:
             # Get effect names
-            effects_response = requests.get(f"{self._base_url}/json/effects", timeout=self.timeout)
-            fxdata_response = requests.get(f"{self._base_url}/json/fxdata", timeout=self.timeout)
+            effects = self._effect_names
+            if effects is None:
+                effects_response = self._session.get(self._url_effects, timeout=self.timeout)
+                if effects_response.status_code == 200:
+                    effects = _json_loads(effects_response.content)
+            
+            fxdata_response = self._session.get(self._url_fxdata, timeout=self.timeout)
             
-            if effects_response.status_code == 200 and fxdata_response.status_code == 200:
-                effects = effects_response.json()
-                fxdata = fxdata_response.json()
+            if effects is not None and fxdata_response.status_code == 200:
+                fxdata = _json_loads(fxdata_response.content)
                 
                 for i, (name, data) in enumerate(zip(effects, fxdata)):
                     if not name or name == '-':
                         continue
                     
-                    # Parse fxdata format: "params;colors;palette;flags;options"
-                    # Flags can be: 0, 01, 1, 2, 01v, 1v, 2v, 01f, 1f, 2f, etc.
-                    meta = {
+                    uses_palette, is_2d, volume, frequency = (
+                        _parse_fxdata_entry(data) if data else (False, False, False, False)
+                    )
+                    metadata[i] = {
                         'name': name,
-                        'is_2d': False,
-                        'uses_palette': False,
-                        'volume': False,
-                        'frequency': False
+                        'is_2d': is_2d,
+                        'uses_palette': uses_palette,
+                        'volume': volume,
+                        'frequency': frequency
                     }
-                    
-                    if data:
-                        parts = data.split(';')
-                        if len(parts) >= 3:
-                            # Third part is palette section - '!' means uses palette
-                            palette_part = parts[2].strip() if len(parts) > 2 else ''
-                            meta['uses_palette'] = '!' in palette_part
-                        
-                        if len(parts) >= 4:
-                            # Fourth part contains flags (e.g., "01", "2", "01v", "2f")
-                            flags = parts[3].strip()
-                            if flags:
-                                # Remove any key=value options (e.g., "01v;m12=0" -> "01v")
-                                flag_part = flags.split(';')[0] if ';' in flags else flags
-                                
-                                # Check for 2D (flag contains '2')
-                                meta['is_2d'] = '2' in flag_part
-                                
-                                # Check for volume reactive (contains 'v')
-                                meta['volume'] = 'v' in flag_part.lower()
-                                
-                                # Check for frequency reactive (contains 'f')
-                                meta['frequency'] = 'f' in flag_part.lower()
-                    
-                    metadata[i] = meta
                 
+                if metadata and vid:
+                    self._effect_metadata = (vid, metadata)
                 LOGGER.info(f"WLED {self.host}: Parsed metadata for {len(metadata)} effects")
                 
         except Exception as e:
@@ -509,6 +1161,382 @@ class WLEDDevice:
         """
         seg_data = {"id": segment_id, **kwargs}
         return self.set_state(seg=[seg_data])
+    
+    def start_ws(self) -> bool:
+        """
+        Start listening to the device's WebSocket feed (ws://host/ws).
+        
+        WLED pushes the full state and info on connect and after every
+        change, so while the feed is up get_state/get_info are served from
+        cache. The listener reconnects with backoff; HTTP polling remains
+        the fallback whenever it is disconnected.
+        
+        Returns:
+            True if the listener is running
+        """
+        if self._ws_future and not self._ws_future.done():
+            return True
+        
+        if aiohttp is None:
+            LOGGER.warning(f"WLED {self.host}: aiohttp not installed - using HTTP polling only")
+            return False
+        
+        self._ws_stop.clear()
+        self._ws_future = asyncio.run_coroutine_threadsafe(self._ws_listen(), _background_loop())
+        return True
+    
+    def stop_ws(self):
+        """Stop the WebSocket listener"""
+        self._ws_stop.set()
+        if self._ws_future:
+            self._ws_future.cancel()
+            self._ws_future = None
+        self._ws_connected = False
+    
+    async def _ws_listen(self):
+        """Receive state pushes from the device, reconnecting on failure"""
+        url = f"ws://{self.host}:{self.port}/ws"
+        delay = 1.0
+        
+        while not self._ws_stop.is_set():
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(url, heartbeat=30, timeout=self.timeout) as ws:
+                        self._ws_connected = True
+                        delay = 1.0
+                        LOGGER.info(f"WLED {self.host}: WebSocket connected")
+                        
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                self._handle_ws_message(msg.data)
+                            elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER.debug(f"WLED {self.host}: WebSocket error - {e}")
+            finally:
+                self._ws_connected = False
+            
+            if self._ws_stop.is_set():
+                break
+            
+            # Back off before reconnecting (1s, 2s, 4s ... 60s)
+            LOGGER.debug(f"WLED {self.host}: WebSocket disconnected, retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+    
+    def _handle_ws_message(self, raw: str):
+        """Apply a state/info push from the WebSocket feed"""
+        try:
+            data = _json_loads(raw)
+        except ValueError as e:
+            LOGGER.debug(f"WLED {self.host}: Bad WebSocket message - {e}")
+            return
+        
+        if not isinstance(data, dict):
+            return
+        
+        if 'state' in data:
+            self._state = WLEDState.from_json(data['state'])
+        if 'info' in data:
+            self._info = WLEDInfo.from_json(data['info'])
+        self._invalidate_validators()
+        self._online = True
+        self._last_error = None
+        self._notify_update()
+    
+    def start_polling(self, interval: float = 2.0, jitter: float = 0.3) -> bool:
+        """
+        Keep the cached state fresh by polling /json/state in the background.
+        
+        Readers then use the state property instead of calling get_state.
+        Each wait is randomised by +/- jitter so many devices don't poll in
+        lockstep, and backs off 1s, 2s, 4s ... 60s while the device is
+        offline. While the WebSocket feed is connected get_state makes no
+        request, so the two can run together.
+        
+        Returns:
+            True if polling is running
+        """
+        if self._poll_future and not self._poll_future.done():
+            return True
+        
+        self._poll_future = asyncio.run_coroutine_threadsafe(
+            self._poll_loop(interval, jitter), _background_loop()
+        )
+        return True
+    
+    def stop_polling(self):
+        """Stop background polling"""
+        if self._poll_future:
+            self._poll_future.cancel()
+            self._poll_future = None
+    
+    async def _poll_loop(self, interval: float, jitter: float):
+        """Poll state forever; the blocking request runs on an executor thread"""
+        loop = asyncio.get_running_loop()
+        backoff = 1.0
+        
+        while True:
+            try:
+                await loop.run_in_executor(None, self.get_state)
+            except Exception as e:
+                LOGGER.debug(f"WLED {self.host}: Background poll failed - {e}")
+            
+            if self._online:
+                backoff = 1.0
+                delay = interval + random.uniform(-jitter, jitter)
+            else:
+                delay = backoff
+                backoff = min(backoff * 2, 60.0)
+            
+            await asyncio.sleep(max(delay, 0.1))
+    
+    def close(self):
+        """Stop background tasks and release pooled HTTP connections"""
+        self._flush_pending()
+        self.stop_polling()
+        self.stop_ws()
+        if self._owns_session:
+            self._session.close()
+
+
+class WLEDAsyncDevice(_WLEDDeviceBase):
+    """
+    Asynchronous WLED Device API Client
+    
+    Mirrors WLEDDevice with coroutines on top of aiohttp, so many devices
+    can be polled concurrently from one event loop (see WLEDApi.poll_all).
+    WLEDApi passes in its own aiohttp.ClientSession so all devices share
+    one keep-alive pool; a standalone device creates a session of its own.
+    """
+    
+    def __init__(self, host: str, port: int = 80, timeout: int = 5,
+                 session: Optional['aiohttp.ClientSession'] = None):
+        """
+        Initialize async WLED device client.
+        
+        Args:
+            host: IP address or hostname of WLED device
+            port: HTTP port (default 80)
+            timeout: Request timeout in seconds
+            session: Shared aiohttp session to issue requests on
+        """
+        super().__init__(host, port, timeout)
+        
+        # aiohttp turns str URLs into yarl.URL on every request - do it once
+        self._url_json = URL(self._url_json)
+        self._url_state = URL(self._url_state)
+        self._url_info = URL(self._url_info)
+        self._url_presets = URL(self._url_presets)
+        self._url_parts = tuple(URL(url) for url in self._url_parts)
+        self._url_effects = self._url_parts[2]
+        
+        self._session = session
+        self._owns_session = session is None
+        self._client_timeout = aiohttp.ClientTimeout(total=timeout)
+        self._batch: Optional[Dict[str, Any]] = None  # pending changes inside batch()
+    
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        """Get the shared session, or this device's own (created on first use)"""
+        if self._session is None or (self._owns_session and self._session.closed):
+            self._session = aiohttp.ClientSession()
+        return self._session
+    
+    async def close(self):
+        """Close the device's own session (a shared one is left to its owner)"""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def _request(self, method: str, url: str,
+                       json_data: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Make HTTP request to WLED device.
+        
+        Args:
+            method: HTTP method (GET, POST)
+            url: Full request URL (one of the pre-built self._url_* values)
+            json_data: JSON data for POST requests
+            
+        Returns:
+            JSON response or None on error
+        """
+        if json_data is not None:
+            body, headers = _json_dumps(json_data), _JSON_HEADERS
+        else:
+            body, headers = None, None
+        
+        try:
+            async with self._get_session().request(method, url, data=body, headers=headers,
+                                             timeout=self._client_timeout) as response:
+                if response.status == 200:
+                    self._online = True
+                    self._last_error = None
+                    return _json_loads(await response.read())
+                
+                self._last_error = f"HTTP {response.status}"
+                LOGGER.warning("WLED %s: HTTP %d on %s", self.host, response.status, url)
+                
+        except asyncio.TimeoutError:
+            self._online = False
+            self._last_error = "Timeout"
+            LOGGER.warning("WLED %s: Request timeout", self.host)
+            
+        except aiohttp.ClientConnectionError as e:
+            self._online = False
+            self._last_error = "Connection error"
+            LOGGER.warning("WLED %s: Connection error - %s", self.host, e)
+            
+        except Exception as e:
+            self._online = False
+            self._last_error = str(e)
+            LOGGER.error("WLED %s: Unexpected error - %s", self.host, e)
+            
+        return None
+    
+    async def refresh(self, include_presets: bool = False) -> bool:
+        """Refresh from /json, plus presets when they changed - see WLEDDevice.refresh"""
+        if not await self.get_all():
+            return False
+        
+        if include_presets and self._presets_stale():
+            await self.get_presets()
+        
+        return True
+    
+    async def get_all(self) -> bool:
+        """Fetch all data from device (state, info, effects, palettes)"""
+        data = await self._request("GET", self._url_json)
+        
+        if data:
+            self._apply_all(data)
+            return True
+        
+        if self._last_error == "HTTP 404":
+            # Firmware without /json - fetch its parts concurrently instead
+            parts = await asyncio.gather(*(self._request("GET", url) for url in self._url_parts))
+            return self._apply_parts(parts)
+        
+        return False
+    
+    async def get_state(self) -> Optional[WLEDState]:
+        """
+        Fetch current state from device.
+        
+        Served by a /json fetch (shared with get_info) that is reused for
+        full_ttl seconds, so a burst of getters costs one round trip.
+        """
+        if not (self._state and self._full_fetch_fresh()) and not await self.get_all():
+            return None
+        return self._state
+    
+    async def get_info(self) -> Optional[WLEDInfo]:
+        """Fetch device info (see get_state)"""
+        if not (self._info and self._full_fetch_fresh()) and not await self.get_all():
+            return None
+        return self._info
+    
+    async def set_state(self, parse_response: bool = True, **kwargs) -> bool:
+        """Set device state - see WLEDDevice.set_state (merged if inside batch())"""
+        if self._batch is not None:
+            _merge_state(self._batch, kwargs)
+            return True
+        
+        return await self._send_state(kwargs, parse_response)
+    
+    @asynccontextmanager
+    async def batch(self):
+        """
+        Merge every set_* call made inside the block into one POST.
+        
+            async with device.batch():
+                await device.set_brightness(128)
+                await device.set_color(255, 0, 0)
+        """
+        if self._batch is not None:
+            # Nested - the outermost batch sends
+            yield self
+            return
+        
+        self._batch = {}
+        try:
+            yield self
+        finally:
+            pending, self._batch = self._batch, None
+            if pending:
+                await self._send_state(pending)
+    
+    async def _send_state(self, kwargs: Dict[str, Any], parse_response: bool = True) -> bool:
+        """POST a state change and update the cached state from the reply"""
+        if self._is_noop(kwargs):
+            return True
+        
+        payload, fast_path = self._state_payload(kwargs, parse_response)
+        data = await self._request("POST", self._url_state, payload)
+        
+        if data:
+            self._apply_state_reply(kwargs, fast_path, data)
+            return True
+        
+        return False
+    
+    async def set_power(self, on: bool) -> bool:
+        """Turn device on or off"""
+        LOGGER.info("WLED %s: Setting power to %s", self.host, on)
+        return await self.set_state(on=on)
+    
+    async def set_brightness(self, brightness: int) -> bool:
+        """Set brightness (0-255)"""
+        brightness = _sat8(brightness)
+        LOGGER.info("WLED %s: Setting brightness to %d", self.host, brightness)
+        return await self.set_state(bri=brightness)
+    
+    async def set_effect(self, effect_id: int, speed: Optional[int] = None,
+                         intensity: Optional[int] = None) -> bool:
+        """Set effect on main segment"""
+        seg_data = {"fx": effect_id}
+        if speed is not None:
+            seg_data["sx"] = _sat8(speed)
+        if intensity is not None:
+            seg_data["ix"] = _sat8(intensity)
+        
+        LOGGER.info("WLED %s: Setting effect to %s", self.host, effect_id)
+        return await self.set_state(seg=[seg_data])
+    
+    async def set_palette(self, palette_id: int) -> bool:
+        """Set palette on main segment"""
+        LOGGER.info("WLED %s: Setting palette to %s", self.host, palette_id)
+        return await self.set_state(seg=[{"pal": palette_id}])
+    
+    async def set_color(self, r: int, g: int, b: int, w: int = 0) -> bool:
+        """Set primary color on main segment"""
+        r, g, b, w = _sat8(r), _sat8(g), _sat8(b), _sat8(w)
+        
+        LOGGER.info("WLED %s: Setting color to RGB(%d,%d,%d)", self.host, r, g, b)
+        return await self.set_state(seg=[{"col": [[r, g, b, w]]}])
+    
+    async def set_preset(self, preset_id: int) -> bool:
+        """Load a preset"""
+        LOGGER.info("WLED %s: Loading preset %s", self.host, preset_id)
+        return await self.set_state(ps=preset_id)
+    
+    async def set_segment_state(self, segment_id: int, **kwargs) -> bool:
+        """Set state for a specific segment - see WLEDDevice.set_segment_state"""
+        return await self.set_state(seg=[{"id": segment_id, **kwargs}])
+    
+    async def get_presets(self) -> Dict[int, str]:
+        """Fetch presets from device (dict of preset ID to name)"""
+        data = await self._request("GET", self._url_presets)
+        
+        if isinstance(data, dict):
+            return self._apply_presets(
+                (key, value['n']) for key, value in data.items()
+                if isinstance(value, dict) and 'n' in value
+            )
+        
+        return {}
 
 
 class WLEDDiscovery:
@@ -518,34 +1546,141 @@ class WLEDDiscovery:
     Uses mDNS (primary) + HTTP probing (fallback) to discover WLED devices.
     """
     
+    # Host numbers probed on the local /24
+    _IP_RANGE = tuple(range(1, 255))
+    
     def __init__(self):
         self._discovered: Dict[str, Dict[str, Any]] = {}
+        self._cached_subnet: Optional[str] = None
+        # One requests.Session per probe worker thread (see _probe_session)
+        self._probe_local = threading.local()
+        # Resident mDNS browser (see start_browser) - lives on the shared loop
+        self._zeroconf: Optional[Any] = None
+        self._browser: Optional[Any] = None
+    
+    def start_browser(self, on_found: Callable[[Dict[str, Any]], None]) -> bool:
+        """
+        Keep an mDNS browser running and report WLED devices as they appear.
+        
+        on_found is called with the same ip/port/name/mac dict discover()
+        returns, once per new device, on the shared event loop's thread -
+        hand any blocking work off to another thread.
+        
+        Returns:
+            True if the browser is running (False if zeroconf is unavailable)
+        """
+        if self._browser is not None:
+            return True
+        
+        try:
+            from zeroconf.asyncio import AsyncZeroconf  # noqa: F401
+        except ImportError:
+            LOGGER.warning("zeroconf not installed - mDNS browser unavailable")
+            return False
+        
+        try:
+            run_coroutine(self._start_browser_async(on_found), timeout=10)
+        except Exception as e:
+            LOGGER.warning(f"Failed to start mDNS browser: {e}")
+            return False
+        return True
+    
+    def stop_browser(self):
+        """Stop the mDNS browser started by start_browser"""
+        if self._browser is None:
+            return
+        try:
+            run_coroutine(self._stop_browser_async(), timeout=5)
+        except Exception as e:
+            LOGGER.debug(f"mDNS browser shutdown error: {e}")
+    
+    async def _start_browser_async(self, on_found: Callable[[Dict[str, Any]], None]):
+        """Create the AsyncZeroconf instance and browser on the shared loop"""
+        from zeroconf import ServiceStateChange
+        from zeroconf.asyncio import AsyncServiceBrowser, AsyncServiceInfo, AsyncZeroconf
+        
+        seen_names = set()
+        pending = set()  # strong refs to in-flight lookups
+        
+        async def resolve(zc, service_type: str, name: str):
+            info = AsyncServiceInfo(service_type, name)
+            try:
+                found = await info.async_request(zc, 3000)
+            except Exception as e:
+                LOGGER.debug(f"mDNS service info error: {e}")
+                found = False
+            
+            addresses = info.parsed_addresses() if found else None
+            if not addresses:
+                # No answer yet - allow a later announcement to retry
+                seen_names.discard(name)
+                return
+            
+            mac = (info.properties or {}).get(b'mac') or b''
+            device = {
+                'ip': addresses[0],
+                'port': info.port or 80,
+                'name': name.replace('._wled._tcp.local.', '').replace('.local', ''),
+                'mac': mac.decode('ascii', 'ignore')
+            }
+            self._discovered[device['ip']] = device
+            LOGGER.debug(f"mDNS browser found: {device['name']} at {device['ip']}")
+            try:
+                on_found(device)
+            except Exception as e:
+                LOGGER.warning(f"mDNS device callback failed: {e}")
+        
+        def on_change(zeroconf, service_type: str, name: str, state_change) -> None:
+            if state_change is not ServiceStateChange.Added or name in seen_names:
+                return
+            seen_names.add(name)
+            task = asyncio.ensure_future(resolve(zeroconf, service_type, name))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        
+        self._zeroconf = AsyncZeroconf()
+        self._browser = AsyncServiceBrowser(self._zeroconf.zeroconf, "_wled._tcp.local.",
+                                            handlers=[on_change])
+    
+    async def _stop_browser_async(self):
+        """Cancel the browser and close its Zeroconf instance"""
+        browser, self._browser = self._browser, None
+        zeroconf, self._zeroconf = self._zeroconf, None
+        if browser is not None:
+            await browser.async_cancel()
+        if zeroconf is not None:
+            await zeroconf.async_close()
     
     def discover(self, timeout: float = 10.0) -> List[Dict[str, Any]]:
         """
         Discover WLED devices using mDNS first, then HTTP probe as fallback.
         
+        WLED advertises itself as _wled._tcp, so a single mDNS browse
+        normally finds every device. The /24 HTTP sweep only runs when
+        mDNS turns up nothing (mDNS blocked, port 5353 busy, etc).
+        
         Args:
             timeout: Total discovery timeout in seconds
             
         Returns:
             List of discovered devices with ip, port, name, mac
         """
-        import time
         start_time = time.time()
         
-        LOGGER.info("=" * 50)
-        LOGGER.info("WLED Discovery started")
-        LOGGER.info("=" * 50)
+        banners = LOGGER.isEnabledFor(logging.INFO)
+        if banners:
+            LOGGER.info("=" * 50)
+            LOGGER.info("WLED Discovery started")
+            LOGGER.info("=" * 50)
         
         all_devices = {}  # Use dict to dedupe by IP
         
-        # Phase 1: mDNS discovery (fast, ~3s)
+        # Phase 1: mDNS discovery (gets half of the time budget)
         mdns_start = time.time()
         LOGGER.info("Phase 1: mDNS discovery started...")
         
         try:
-            mdns_devices = self._discover_mdns(timeout=3.0)
+            mdns_devices = self._discover_mdns(timeout=timeout / 2)
             mdns_elapsed = time.time() - mdns_start
             
             for device in mdns_devices:
@@ -557,56 +1692,59 @@ class WLEDDiscovery:
             LOGGER.warning(f"Phase 1 mDNS failed: {e}")
             mdns_elapsed = time.time() - mdns_start
         
-        # Phase 2: HTTP probe for any missed devices
-        http_start = time.time()
-        remaining_timeout = max(1.0, timeout - (time.time() - start_time))
-        found_ips = set(all_devices.keys())
-        
-        LOGGER.info(f"Phase 2: HTTP probe started (excluding {len(found_ips)} already found)...")
-        
-        try:
-            http_devices = self._discover_http(timeout=remaining_timeout, exclude_ips=found_ips)
-            http_elapsed = time.time() - http_start
+        # Phase 2: HTTP probe, only if mDNS found nothing
+        if all_devices:
+            LOGGER.info("Phase 2: HTTP probe skipped (devices found via mDNS)")
+        else:
+            http_start = time.time()
+            remaining_timeout = max(1.0, timeout - (time.time() - start_time))
             
-            new_count = 0
-            for device in http_devices:
-                if device['ip'] not in all_devices:
-                    all_devices[device['ip']] = device
-                    new_count += 1
-                    LOGGER.info(f"  HTTP: Found \"{device['name']}\" ({device['ip']})")
+            LOGGER.info("Phase 2: HTTP probe started (no devices found via mDNS)...")
             
-            LOGGER.info(f"Phase 2 complete: {new_count} additional device(s) via HTTP in {http_elapsed:.1f}s")
-        except Exception as e:
-            LOGGER.warning(f"Phase 2 HTTP probe failed: {e}")
+            try:
+                http_devices = self._discover_http(timeout=remaining_timeout)
+                http_elapsed = time.time() - http_start
+                
+                for device in http_devices:
+                    if device['ip'] not in all_devices:
+                        all_devices[device['ip']] = device
+                        LOGGER.info(f"  HTTP: Found \"{device['name']}\" ({device['ip']})")
+                
+                LOGGER.info(f"Phase 2 complete: {len(http_devices)} device(s) via HTTP in {http_elapsed:.1f}s")
+            except Exception as e:
+                LOGGER.warning(f"Phase 2 HTTP probe failed: {e}")
         
         # Summary
         total_elapsed = time.time() - start_time
         devices = list(all_devices.values())
         
-        LOGGER.info("=" * 50)
-        LOGGER.info(f"Discovery complete: {len(devices)} total device(s) in {total_elapsed:.1f}s")
-        for d in devices:
-            LOGGER.info(f"  - {d['name']} ({d['ip']})")
-        LOGGER.info("=" * 50)
+        if banners:
+            LOGGER.info("=" * 50)
+            LOGGER.info("Discovery complete: %d total device(s) in %.1fs", len(devices), total_elapsed)
+            for d in devices:
+                LOGGER.info("  - %s (%s)", d['name'], d['ip'])
+            LOGGER.info("=" * 50)
         
         return devices
     
-    def _discover_mdns(self, timeout: float = 3.0) -> List[Dict[str, Any]]:
+    def _discover_mdns(self, timeout: float = 3.0, quiet: float = 1.0) -> List[Dict[str, Any]]:
         """
         Discover WLED devices via mDNS (Zeroconf).
         WLED devices register as _wled._tcp.local
         
         Args:
             timeout: Discovery timeout in seconds
+            quiet: Once a device has answered, stop after this long
+                without another one instead of waiting out the timeout
             
         Returns:
             List of discovered devices
         """
-        import time
-        import threading
-        
         devices = []
+        seen_names = set()
+        seen_addresses = set()  # packed IPv4 bytes, or IP strings from the fallback
         devices_lock = threading.Lock()
+        found = threading.Event()  # set whenever a device is added
         
         try:
             from zeroconf import ServiceBrowser, Zeroconf, ServiceListener
@@ -616,34 +1754,58 @@ class WLEDDiscovery:
                     self.start_time = time.time()
                 
                 def add_service(self, zc: Zeroconf, type_: str, name: str) -> None:
+                    # Announcements are bursty - don't re-query a service we already have
+                    with devices_lock:
+                        if name in seen_names:
+                            return
+                        seen_names.add(name)
+                    
                     try:
                         info = zc.get_service_info(type_, name)
                         if info:
-                            # Get IP address
-                            if info.addresses:
-                                ip = '.'.join(str(b) for b in info.addresses[0])
-                            elif info.parsed_addresses():
-                                ip = info.parsed_addresses()[0]
+                            # Dedupe on the packed address before converting it
+                            addresses = info.addresses
+                            if addresses and len(addresses[0]) == 4:
+                                key = addresses[0]
                             else:
-                                return
+                                parsed = info.parsed_addresses()
+                                if not parsed:
+                                    return
+                                key = parsed[0]
+                            
+                            with devices_lock:
+                                if key in seen_addresses:
+                                    return
+                                seen_addresses.add(key)
+                            
+                            # Packed IPv4 -> dotted quad in one C call
+                            ip = socket.inet_ntoa(key) if isinstance(key, bytes) else key
                             
                             # Get device name (strip .local suffix)
                             device_name = name.replace('._wled._tcp.local.', '').replace('.local', '')
                             
+                            # WLED publishes its MAC in the TXT record
+                            mac = (info.properties or {}).get(b'mac') or b''
+                            
                             device = {
                                 'ip': ip,
                                 'port': info.port or 80,
                                 'name': device_name,
-                                'mac': ''
+                                'mac': mac.decode('ascii', 'ignore')
                             }
                             
                             elapsed = time.time() - self.start_time
                             with devices_lock:
-                                # Avoid duplicates
-                                if not any(d['ip'] == ip for d in devices):
-                                    devices.append(device)
-                                    LOGGER.debug(f"mDNS found: {device_name} at {ip} ({elapsed:.2f}s)")
+                                devices.append(device)
+                            found.set()
+                            LOGGER.debug(f"mDNS found: {device_name} at {ip} ({elapsed:.2f}s)")
+                        else:
+                            # No answer yet - allow a later announcement to retry
+                            with devices_lock:
+                                seen_names.discard(name)
                     except Exception as e:
+                        with devices_lock:
+                            seen_names.discard(name)
                         LOGGER.debug(f"mDNS service info error: {e}")
                 
                 def remove_service(self, zc: Zeroconf, type_: str, name: str) -> None:
@@ -657,8 +1819,16 @@ class WLEDDiscovery:
             listener = WLEDListener()
             browser = ServiceBrowser(zeroconf, "_wled._tcp.local.", listener)
             
-            # Wait for timeout
-            time.sleep(timeout)
+            # Wait for answers - the whole timeout until the first device,
+            # then only until announcements go quiet
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if not found.wait(min(remaining, quiet) if devices else remaining):
+                    break
+                found.clear()
             
             # Cleanup
             browser.cancel()
@@ -687,79 +1857,194 @@ class WLEDDiscovery:
         Returns:
             List of discovered devices
         """
-        import concurrent.futures
-        import threading
-        import time
-        
-        devices = []
-        devices_lock = threading.Lock()
         exclude_ips = exclude_ips or set()
         
-        # Get local IP to determine subnet
-        local_ip = self._get_local_ip()
-        if not local_ip:
+        # Determine the local /24 (cached after the first lookup)
+        subnet_prefix = self._get_subnet_prefix()
+        if not subnet_prefix:
             LOGGER.warning("Could not determine local IP for HTTP probe")
-            return devices
+            return []
+        
+        # Hosts the kernel has recently talked to are far more likely to be
+        # live - probe those first, then sweep the rest of the /24 on the
+        # remaining budget, since idle WLEDs can age out of the ARP cache
+        devices = []
+        live_ips = self._live_hosts(subnet_prefix) - exclude_ips
+        if len(live_ips) >= 5:
+            LOGGER.debug(f"HTTP probe: trying {len(live_ips)} hosts from the ARP cache")
+            started = time.monotonic()
+            devices = self._probe_ips(sorted(live_ips), timeout)
+            timeout -= time.monotonic() - started
+            if timeout <= 1.0:
+                LOGGER.debug("HTTP probe: no time left to sweep the rest of the subnet")
+                return devices
+            exclude_ips = exclude_ips | live_ips
         
         # Generate IPs to probe (same /24 subnet), excluding already found
-        subnet_prefix = '.'.join(local_ip.split('.')[:3])
-        ips_to_probe = [f"{subnet_prefix}.{i}" for i in range(1, 255) 
-                       if f"{subnet_prefix}.{i}" not in exclude_ips]
+        ip_fmt = subnet_prefix + ".%d"
+        ips_to_probe = (ip for ip in (ip_fmt % i for i in self._IP_RANGE)
+                        if ip not in exclude_ips)
         
-        LOGGER.debug(f"HTTP probe: scanning {len(ips_to_probe)} IPs on {subnet_prefix}.0/24")
+        LOGGER.debug(f"HTTP probe: scanning {subnet_prefix}.0/24 ({len(exclude_ips)} excluded)")
+        return devices + self._probe_ips(ips_to_probe, timeout)
+    
+    def _probe_ips(self, ips_to_probe: Iterable[str], timeout: float) -> List[Dict[str, Any]]:
+        """
+        Probe the given IPs for WLED devices within the timeout.
         
-        failed_ips = []  # Track failed IPs for retry
-        failed_lock = threading.Lock()
+        Returns:
+            List of discovered devices
+        """
+        devices = []
         
-        def probe_and_collect(ip: str, is_retry: bool = False):
-            """Probe IP and add to results if WLED found"""
-            device = self._probe_ip(ip, timeout=2.0)  # 2s timeout for reliability
-            if device:
-                with devices_lock:
-                    if not any(d['ip'] == ip for d in devices):
-                        devices.append(device)
-                        if is_retry:
-                            LOGGER.debug(f"HTTP retry found: {device['name']} at {ip}")
-            elif not is_retry:
-                # Track for retry
-                with failed_lock:
-                    failed_ips.append(ip)
-        
-        # First pass: probe all IPs with 30 workers (reduced from 50)
+        # With aiohttp, all probes run as coroutines on the shared event
+        # loop - one pass, no retry needed, no thread per probe
+        if aiohttp is not None:
+            try:
+                return run_coroutine(self._discover_http_async(ips_to_probe, timeout), timeout + 1.0)
+            except Exception as e:
+                LOGGER.error(f"HTTP probe error: {e}")
+                return devices
+        
+        # First pass: probe all IPs concurrently (70% of the timeout budget)
         try:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=30) as executor:
-                futures = [executor.submit(probe_and_collect, ip, False) for ip in ips_to_probe]
-                concurrent.futures.wait(futures, timeout=timeout * 0.7)  # Use 70% of timeout for first pass
+            found, failed_ips = self._probe_many(ips_to_probe, timeout * 0.7, max_workers=128)
+            devices.extend(found)
         except Exception as e:
             LOGGER.error(f"HTTP probe error: {e}")
+            failed_ips = []
         
         # Second pass: retry failed IPs (some may have been temporarily busy)
         if failed_ips and (timeout * 0.3) > 1.0:
             LOGGER.debug(f"HTTP probe: retrying {len(failed_ips)} failed IPs...")
             try:
-                with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                    futures = [executor.submit(probe_and_collect, ip, True) for ip in failed_ips]
-                    concurrent.futures.wait(futures, timeout=timeout * 0.3)
+                found, _ = self._probe_many(failed_ips, timeout * 0.3, max_workers=64)
+                seen_ips = {d['ip'] for d in devices}
+                for device in found:
+                    if device['ip'] not in seen_ips:
+                        seen_ips.add(device['ip'])
+                        devices.append(device)
+                        LOGGER.debug(f"HTTP retry found: {device['name']} at {device['ip']}")
             except Exception as e:
                 LOGGER.debug(f"HTTP retry error: {e}")
         
         return devices
     
+    async def _discover_http_async(self, ips: Iterable[str], timeout: float) -> List[Dict[str, Any]]:
+        """
+        Probe IPs concurrently with aiohttp.
+        
+        Every probe is started at once, each with a 2s connect / 1s read
+        budget, so the wall time is about that of the slowest WLED reply.
+        Probes still running when the timeout elapses are cancelled.
+        
+        Returns:
+            List of discovered devices
+        """
+        probe_timeout = aiohttp.ClientTimeout(total=3.0, sock_connect=2.0, sock_read=1.0)
+        connector = aiohttp.TCPConnector(limit=256, ssl=False)
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=probe_timeout) as session:
+            tasks = [asyncio.ensure_future(self._probe_async(session, ip)) for ip in ips]
+            if not tasks:
+                return []
+            
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                LOGGER.debug(f"HTTP probe: {len(pending)} IPs still pending after {timeout:.1f}s")
+                await asyncio.wait(pending)
+        
+        return [device for device in (task.result() for task in done) if device]
+    
+    @staticmethod
+    async def _probe_async(session: 'aiohttp.ClientSession', ip: str) -> Optional[Dict[str, Any]]:
+        """Probe a single IP for WLED device (aiohttp version of _probe_ip)"""
+        try:
+            async with session.get(_PROBE_URL % ip) as response:
+                if response.status != 200 or 'json' not in response.content_type:
+                    return None
+                # /json/info is ~1 KB; anything this large is not WLED
+                body = await response.content.read(_PROBE_MAX_BYTES + 1)
+                if len(body) > _PROBE_MAX_BYTES:
+                    return None
+            return WLEDDiscovery._device_from_info(ip, body)
+        except Exception:
+            return None  # Timeouts and refused connections are expected
+    
+    @staticmethod
+    def _device_from_info(ip: str, body: bytes) -> Optional[Dict[str, Any]]:
+        """Build a discovery entry from a /json/info body, or None if it isn't WLED"""
+        data = _json_loads(body)
+        # Check if it's a WLED device (has version and name)
+        if 'ver' in data and 'name' in data:
+            return {
+                'ip': ip,
+                'port': 80,
+                'name': data.get('name', ip),
+                'mac': data.get('mac', '')
+            }
+        return None
+    
+    def _probe_many(self, ips: Iterable[str], timeout: float,
+                    max_workers: int = 128) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Probe a batch of IPs concurrently.
+        
+        All probes are fanned out at once so the wall time is bounded by
+        the slowest probe rather than the sum of them. Probes still pending
+        when the timeout elapses are cancelled.
+        
+        Args:
+            ips: IP addresses to probe
+            timeout: Time budget for the whole batch in seconds
+            max_workers: Maximum number of concurrent probes
+        
+        Returns:
+            Tuple of (devices found, IPs that did not answer as WLED)
+        """
+        import concurrent.futures
+        
+        devices = []
+        failed_ips = []
+        
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        futures = {executor.submit(self._probe_ip, ip, 2.0): ip for ip in ips}  # 2s timeout for reliability
+        try:
+            for future in concurrent.futures.as_completed(futures, timeout=timeout):
+                device = future.result()
+                if device:
+                    devices.append(device)
+                else:
+                    failed_ips.append(futures[future])
+        except concurrent.futures.TimeoutError:
+            pending = [ip for future, ip in futures.items() if not future.done()]
+            LOGGER.debug(f"HTTP probe: {len(pending)} IPs still pending after {timeout:.1f}s")
+            failed_ips.extend(pending)
+        finally:
+            # Don't block on stragglers - cancel anything that hasn't started
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return devices, failed_ips
+    
     def _probe_ip(self, ip: str, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
         """Probe a single IP for WLED device"""
         try:
-            response = requests.get(f"http://{ip}/json/info", timeout=timeout)
-            if response.status_code == 200:
-                data = response.json()
-                # Check if it's a WLED device (has version and name)
-                if 'ver' in data and 'name' in data:
-                    device = {
-                        'ip': ip,
-                        'port': 80,
-                        'name': data.get('name', ip),
-                        'mac': data.get('mac', '')
-                    }
-                    return device
+            # Stream so non-WLED hosts can be rejected on the headers alone,
+            # without downloading or decoding whatever page they serve
+            with self._probe_session().get(_PROBE_URL % ip, timeout=timeout,
+                                           stream=True) as response:
+                if response.status_code != 200:
+                    return None
+                if 'json' not in response.headers.get('Content-Type', ''):
+                    return None
+                # /json/info is ~1 KB; anything this large is not WLED
+                body = response.raw.read(_PROBE_MAX_BYTES + 1, decode_content=True)
+                if len(body) > _PROBE_MAX_BYTES:
+                    return None
+            
+            return self._device_from_info(ip, body)
         except requests.exceptions.Timeout:
             pass  # Expected for non-responsive IPs
         except requests.exceptions.ConnectionError:
@@ -768,17 +2053,62 @@ class WLEDDiscovery:
             pass  # Any other error, skip silently
         return None
     
-    def _get_local_ip(self) -> Optional[str]:
-        """Get local IP address"""
+    @staticmethod
+    def _live_hosts(subnet_prefix: str) -> set:
+        """
+        Get IPs in the /24 with a resolved entry in the kernel ARP cache.
+        
+        Reads /proc/net/arp, so this is empty on platforms without it.
+        """
+        prefix = subnet_prefix + '.'
+        hosts = set()
         try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            ip = s.getsockname()[0]
-            s.close()
-            return ip
-        except Exception as e:
-            LOGGER.error(f"Failed to get local IP: {e}")
-            return None
+            with open('/proc/net/arp') as f:
+                next(f, None)  # Header row
+                for line in f:
+                    # IP address, HW type, Flags, HW address, Mask, Device
+                    fields = line.split()
+                    if len(fields) >= 3 and fields[0].startswith(prefix) and fields[2] != '0x0':
+                        hosts.add(fields[0])
+        except OSError:
+            pass
+        return hosts
+    
+    def _probe_session(self) -> requests.Session:
+        """
+        Get the calling thread's probe session.
+        
+        requests.get() builds and tears down a Session (adapters, pool,
+        proxy/env lookup) per call; sessions aren't thread-safe, so each
+        probe worker keeps its own and reuses it across the sweep.
+        """
+        session = getattr(self._probe_local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=1, max_retries=0))
+            self._probe_local.session = session
+        return session
+    
+    def _get_subnet_prefix(self) -> Optional[str]:
+        """Get the local /24 prefix (e.g. '192.168.1'), cached after first lookup"""
+        if self._cached_subnet is None:
+            local_ip = self._get_local_ip()
+            if local_ip:
+                self._cached_subnet = local_ip.rsplit('.', 1)[0]
+        return self._cached_subnet
+    
+    def _get_local_ip(self) -> Optional[str]:
+        """Get local IP address (looked up once per process, see refresh_network)"""
+        ip = _get_local_ip_cached()
+        if ip is None:
+            # Don't pin a failed lookup - try again next time
+            _get_local_ip_cached.cache_clear()
+        return ip
+    
+    def refresh_network(self):
+        """Forget the cached local IP/subnet, e.g. after a network change"""
+        _get_local_ip_cached.cache_clear()
+        self._cached_subnet = None
     
     def discover_simple(self, timeout: float = 5.0) -> List[str]:
         """
@@ -801,8 +2131,18 @@ class WLEDApi:
     Provides device management and discovery capabilities.
     """
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
+        """
+        Args:
+            session: requests.Session for all sync devices to share; one is
+                created on first add_device if omitted (and closed by close())
+        """
         self._devices: Dict[str, WLEDDevice] = {}
+        self._async_devices: Dict[str, WLEDAsyncDevice] = {}
+        self._session: Optional[requests.Session] = session  # shared by sync devices
+        self._owns_session = session is None
+        self._http: Optional['aiohttp.ClientSession'] = None  # shared by async devices
+        self._pending_closes: set = set()  # strong refs so close tasks can't be GC'd mid-flight
         self._discovery = WLEDDiscovery()
     
     def add_device(self, host: str, port: int = 80) -> WLEDDevice:
@@ -818,7 +2158,10 @@ class WLEDApi:
         """
         key = f"{host}:{port}"
         if key not in self._devices:
-            self._devices[key] = WLEDDevice(host, port)
+            if self._session is None:
+                # One keep-alive pool for every device (32 hosts x 4 connections)
+                self._session = _keepalive_session(pool_connections=32)
+            self._devices[key] = WLEDDevice(host, port, session=self._session)
         return self._devices[key]
     
     def get_device(self, host: str, port: int = 80) -> Optional[WLEDDevice]:
@@ -830,7 +2173,94 @@ class WLEDApi:
         """Remove a device"""
         key = f"{host}:{port}"
         if key in self._devices:
-            del self._devices[key]
+            self._devices.pop(key).close()
+    
+    def close(self):
+        """Close all sync devices and their shared session"""
+        for device in self._devices.values():
+            device.close()
+        self._devices.clear()
+        if self._owns_session and self._session is not None:
+            self._session.close()
+            self._session = None
+    
+    async def add_async_device(self, host: str, port: int = 80) -> WLEDAsyncDevice:
+        """
+        Add an async device to manage.
+        
+        A coroutine because the shared aiohttp session has to be created
+        on the event loop that will use it.
+        
+        Returns:
+            WLEDAsyncDevice instance
+        """
+        key = f"{host}:{port}"
+        if key not in self._async_devices:
+            if self._http is None or self._http.closed:
+                self._http = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=100, limit_per_host=4, keepalive_timeout=75),
+                    timeout=aiohttp.ClientTimeout(total=10)
+                )
+            self._async_devices[key] = WLEDAsyncDevice(host, port, session=self._http)
+        return self._async_devices[key]
+    
+    def remove_async_device(self, host: str, port: int = 80):
+        """Remove an async device, closing it in the background (call from the event loop)"""
+        device = self._async_devices.pop(f"{host}:{port}", None)
+        if device is not None:
+            task = asyncio.get_running_loop().create_task(device.close())
+            self._pending_closes.add(task)
+            task.add_done_callback(self._pending_closes.discard)
+    
+    async def poll_all(self) -> Dict[str, bool]:
+        """
+        Refresh every async device concurrently.
+        
+        Returns:
+            Dict mapping "host:port" to whether its refresh succeeded
+        """
+        keys = list(self._async_devices)
+        outcomes = await asyncio.gather(
+            *(self._async_devices[key].get_all() for key in keys), return_exceptions=True
+        )
+        
+        # One failing device must not cancel or hide the others' results
+        results = {}
+        for key, outcome in zip(keys, outcomes):
+            if isinstance(outcome, BaseException):
+                LOGGER.warning("WLED %s: Poll failed - %s", key, outcome)
+                outcome = False
+            results[key] = outcome
+        return results
+    
+    async def close_all(self):
+        """Drop all async devices and close their shared session"""
+        self._async_devices.clear()
+        if self._pending_closes:
+            await asyncio.gather(*self._pending_closes, return_exceptions=True)
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+    
+    @staticmethod
+    def install_uvloop() -> bool:
+        """
+        Run the shared background loop on uvloop, if it is installed.
+        
+        Call once at startup, before any device starts its WebSocket or
+        run_coroutine() is used - an already running loop is not replaced.
+        Only this module's loop is affected, not the global event loop policy.
+        
+        Returns:
+            True if uvloop will be used
+        """
+        global _loop_factory
+        try:
+            import uvloop
+        except ImportError:
+            return False
+        _loop_factory = uvloop.new_event_loop
+        return True
     
     def discover(self, timeout: float = 10.0) -> List[Dict[str, Any]]:
         """
@@ -841,7 +2271,20 @@ class WLEDApi:
         """
         return self._discovery.discover(timeout)
     
+    def start_browser(self, on_found: Callable[[Dict[str, Any]], None]) -> bool:
+        """Report devices as they announce themselves - see WLEDDiscovery.start_browser"""
+        return self._discovery.start_browser(on_found)
+    
+    def stop_browser(self):
+        """Stop the resident mDNS browser"""
+        self._discovery.stop_browser()
+    
     @property
     def devices(self) -> Dict[str, WLEDDevice]:
         """Get all managed devices"""
         return self._devices
+    
+    @property
+    def async_devices(self) -> Dict[str, WLEDAsyncDevice]:
+        """Get all managed async devices"""
+        return self._async_devices
@@ -3,17 +3,134 @@ WLED Controller Node
 
 Main controller node that manages device discovery, configuration,
 and creates/removes WLED device nodes.
+
+Devices are added and removed under _devices_lock (from the PG3 thread,
+the poll pool and the mDNS browser). Everything else reads the _nodes
+and _entries tuples, which writers replace rather than mutate, so polls
+and bulk commands iterate a snapshot without taking the lock. The
+short-poll schedule fields on each DeviceEntry are read and written
+under _schedule_lock, since PG3 polls and bulk commands can poll at once.
 """
 
 import udi_interface
+import datetime
+import hashlib
+import io
 import logging
-from typing import Optional, Dict, Any
+import os
+import re
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from typing import Optional, Dict, Any, Tuple, Callable
+
+from nodes.node_mixins import DriverBatchMixin
+from nodes.wled_device import WLEDDevice
 
 LOGGER = udi_interface.LOGGER
 Custom = udi_interface.Custom
 
+# Timestamp format for notices
+_TS_FMT = "%m/%d %H:%M"
+
+# NLS lines owned by _update_effect_nls: effect entries and their header
+_EFFECT_NLS_RE = re.compile(r'EFFECT-|# effects-sig:|.*(?:Effect Names|WLED effects)')
+_EFFECT_SIG_PREFIX = '# effects-sig: '
+
+# Shown in the PG3 Configuration tab by Controller._set_config_docs
+_CONFIG_DOCS_HTML = '''
+<h2>WLED Polyglot v3 NodeServer</h2>
+<p style="color: #888;">Version 1.5.5</p>
+
+<br>
+
+<h3>Manual Configuration</h3>
+
+<p>To manually add WLED devices, add a Custom Parameter below:</p>
+
+<br>
+
+<table border="1" cellpadding="10" style="border-collapse: collapse;">
+  <tr><th align="left">Key</th><th align="left">Value</th></tr>
+  <tr><td><b>devices</b></td><td>arcade:192.168.1.112,bar:192.168.1.185,kitchen:192.168.1.99</td></tr>
+</table>
+
+<br>
+
+<p><i>Format: name1:ip1,name2:ip2,name3:ip3</i></p>
+
+<br><br>
+
+<h3>Auto-Discovery</h3>
+
+<p>Click the <b>Discover</b> button above to automatically find WLED devices on your network.</p>
+
+<br><br>
+
+<hr>
+
+<br>
+
+<table cellpadding="5">
+  <tr>
+    <td><a href="https://github.com/superflytnt/udi-wled-poly" target="_blank">Source Code</a></td>
+    <td style="color: #666;">—</td>
+    <td>View and contribute on GitHub</td>
+  </tr>
+  <tr>
+    <td><a href="https://github.com/superflytnt/udi-wled-poly#readme" target="_blank">Documentation</a></td>
+    <td style="color: #666;">—</td>
+    <td>Setup guide and command reference</td>
+  </tr>
+  <tr>
+    <td><a href="https://github.com/superflytnt/udi-wled-poly/issues" target="_blank">Report Issue</a></td>
+    <td style="color: #666;">—</td>
+    <td>Bug reports and feature requests</td>
+  </tr>
+  <tr>
+    <td><a href="https://kno.wled.ge/" target="_blank">WLED Docs</a></td>
+    <td style="color: #666;">—</td>
+    <td>Official WLED documentation</td>
+  </tr>
+</table>
+'''
+
+# Characters that would split a saved "name:ip,..." entry; _mk_address drops
+# them too, so removing them keeps the device's node address
+_SAVED_NAME_TABLE = str.maketrans('', '', ',:')
 
-class Controller(udi_interface.Node):
+# Node addresses: spaces and dots become underscores (see _mk_address)
+_ADDR_TABLE = str.maketrans(' .', '__')
+
+# Longest gap, in short polls, between polls of a device whose state isn't
+# changing: one long poll window at the default shortPoll 30 / longPoll 120
+_MAX_POLL_EVERY = 4
+
+
+@dataclass(**({'slots': True} if sys.version_info >= (3, 10) else {}))
+class DeviceEntry:
+    """A managed WLED device and its node"""
+    name: str
+    ip: str
+    port: int
+    node: Any
+    # Poll callables bound once at add time (see _poll_devices)
+    update_short: Callable[[], None] = field(init=False, repr=False)
+    update_long: Callable[[], None] = field(init=False, repr=False)
+    # Adaptive short-poll schedule (see Controller._reschedule)
+    poll_every: int = field(default=1, init=False)
+    skip: int = field(default=0, init=False)
+    seen: Any = field(default=None, init=False, repr=False)
+    
+    def __post_init__(self):
+        self.update_short = self.node.update_status
+        self.update_long = partial(self.node.update_status, full_sync=True)
+
+
+class Controller(DriverBatchMixin, udi_interface.Node):
     """
     WLED Controller Node
     
@@ -56,19 +173,45 @@ class Controller(udi_interface.Node):
         self.address = address
         
         # Managed devices
-        self._devices: Dict[str, Any] = {}
+        self._devices: Dict[str, DeviceEntry] = {}
+        # Device nodes in insertion order. Replaced (never mutated) on add/remove,
+        # so readers on any thread iterate a consistent snapshot without locking
+        self._nodes: Tuple[Any, ...] = ()
+        self._entries: Tuple[DeviceEntry, ...] = ()  # same order, for the poll fan-out
+        # Devices can be added from the mDNS browser and pool threads as well
+        # as the PG3 thread; _adding reserves addresses while nodes are built
+        self._devices_lock = threading.Lock()
+        self._adding: set = set()
+        # (ip, port) of every managed or in-progress device - one node per
+        # device, since nodes for the same host would share one API client
+        self._hosts: set = set()
         self._wled_api = None
         self._last_effect = 0  # Track last effect set via "All Effect"
         
+        # Device HTTP calls are I/O-bound, so polls fan out across threads
+        self._pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="wled-poll")
+        self._poll_timeout = 15.0  # seconds a poll waits for stragglers before moving on
+        self._schedule_lock = threading.Lock()  # guards the DeviceEntry short-poll schedule
+        
         # Configuration
         self._config_done = False
+        self._devices_sig: Optional[str] = None  # digest of the last applied 'devices' param
+        self._configured: Dict[str, str] = {}    # address -> IP of devices from that param
+        self._effects_sig: Optional[str] = None  # digest of the effect metadata last written to NLS
+        self._profile_reload_timer: Optional[threading.Timer] = None  # see _schedule_profile_reload
+        self._profile_lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None  # see _schedule_save_devices
+        self._save_lock = threading.Lock()
         self._custom_params = Custom(polyglot, 'customparams')
+        # Devices found by discovery, saved apart from the user's 'devices' param
+        self._custom_data = Custom(polyglot, 'customdata')
         
         # Subscribe to events
         polyglot.subscribe(polyglot.START, self.start, address)
         polyglot.subscribe(polyglot.POLL, self.poll)
         polyglot.subscribe(polyglot.STOP, self.stop)
         polyglot.subscribe(polyglot.CUSTOMPARAMS, self.parameter_handler)
+        polyglot.subscribe(polyglot.CUSTOMDATA, self.data_handler)
         polyglot.subscribe(polyglot.ADDNODEDONE, self.node_added)
         polyglot.subscribe(polyglot.DISCOVER, self.discover)  # Handle Discover button in PG3
         
@@ -78,7 +221,6 @@ class Controller(udi_interface.Node):
     
     def start(self):
         """Start the controller node"""
-        import datetime
         LOGGER.info(f"Starting WLED Controller: {self.name}")
         
         # Initialize WLED API
@@ -89,12 +231,23 @@ class Controller(udi_interface.Node):
         self.setDriver('ST', 1)
         self.setDriver('GV1', self.VERSION)
         
-        # Load configuration and add configured devices
+        # Load configuration and add configured devices, then the ones an
+        # earlier discovery saved
         self._load_config()
+        self._load_discovered()
+        
+        # A fresh install has nothing configured or saved yet, so scan once.
+        # mDNS can't be relied on (eISY/Polisy hold port 5353 themselves), so
+        # this is the full discovery with its HTTP sweep
+        if not self._devices:
+            LOGGER.info("Running auto-discovery for WLED devices...")
+            self.discover()
         
-        # Auto-discover additional WLED devices on startup (this can take a while)
-        LOGGER.info("Running auto-discovery for WLED devices...")
-        self.discover()
+        # Where mDNS announcements do get through, pick up new devices as they appear
+        if self._wled_api.start_browser(self._on_mdns_device):
+            LOGGER.info("mDNS browser started - new WLED devices will be added as they appear")
+        else:
+            LOGGER.info("mDNS browser unavailable - click Discover to scan for new devices")
         
         # Rebuild presets and effects with metadata after all devices are loaded
         if self._devices:
@@ -102,9 +255,12 @@ class Controller(udi_interface.Node):
             self.rebuild_presets()  # This also calls _rebuild_effects_nls()
         
         # Show startup notice
-        timestamp = datetime.datetime.now().strftime("%m/%d %H:%M")
+        timestamp = datetime.datetime.now().strftime(_TS_FMT)
         self.poly.Notices['startup'] = f"WLED Controller started ({timestamp}) - {len(self._devices)} device(s) configured"
         
+        # Send any profile changes made during startup in one reload
+        self._flush_profile()
+        
         LOGGER.info("WLED Controller started successfully")
     
     def _load_config(self):
@@ -118,75 +274,76 @@ class Controller(udi_interface.Node):
         # Format: "name1:192.168.1.100,name2:192.168.1.101"
         devices_str = params.get('devices', '')
         
+        # CUSTOMPARAMS fires for any parameter change - skip if this one is unchanged
+        sig = hashlib.blake2b(devices_str.encode(), digest_size=16).hexdigest()
+        if sig == self._devices_sig:
+            LOGGER.debug("Device configuration unchanged")
+            self._config_done = True
+            return
+        self._devices_sig = sig
+        
         if devices_str:
             LOGGER.info(f"Found device configuration: {devices_str}")
             self._parse_devices(devices_str)
         else:
             LOGGER.info("No devices configured. Use Discover or add manually.")
+            self._parse_devices(devices_str)
             # Set help text for configuration
             self._set_config_docs()
         
         self._config_done = True
     
+    def _load_discovered(self):
+        """Add the devices an earlier discovery saved (see _save_devices)"""
+        saved = self._parse_entries(self._custom_data.get('discovered', ''))
+        for address, (name, ip) in saved.items():
+            if address not in self._devices:
+                self._add_wled_device(name, ip, address=address)
+    
+    def _save_devices(self):
+        """
+        Save the discovered devices to custom data.
+        
+        Restarts then load them instead of running a blocking discovery.
+        Devices from the 'devices' parameter are left to the user's string,
+        which is never rewritten.
+        """
+        with self._devices_lock:
+            devices = dict(self._devices)
+        configured = self._configured
+        saved = ','.join(f"{entry.name.translate(_SAVED_NAME_TABLE)}:{entry.ip}"
+                         for address, entry in devices.items() if address not in configured)
+        if saved == self._custom_data.get('discovered', ''):
+            return
+        
+        self._custom_data['discovered'] = saved
+        LOGGER.info(f"Saved {saved.count(',') + 1 if saved else 0} discovered device(s)")
+    
+    def _schedule_save_devices(self, delay: float = 5.0):
+        """
+        Save the device list once mDNS additions settle.
+        
+        The browser reports devices one at a time, so a burst of them
+        re-arms one timer instead of each rewriting the parameter.
+        """
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(delay, self._save_devices_timer)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def _save_devices_timer(self):
+        """Timer callback for _schedule_save_devices"""
+        with self._save_lock:
+            if self._save_timer is not threading.current_thread():
+                return
+            self._save_timer = None
+        self._save_devices()
+    
     def _set_config_docs(self):
         """Set configuration documentation - displays in PG3 Configuration tab"""
-        html = '''
-<h2>WLED Polyglot v3 NodeServer</h2>
-<p style="color: #888;">Version 1.5.5</p>
-
-<br>
-
-<h3>Manual Configuration</h3>
-
-<p>To manually add WLED devices, add a Custom Parameter below:</p>
-
-<br>
-
-<table border="1" cellpadding="10" style="border-collapse: collapse;">
-  <tr><th align="left">Key</th><th align="left">Value</th></tr>
-  <tr><td><b>devices</b></td><td>arcade:192.168.1.112,bar:192.168.1.185,kitchen:192.168.1.99</td></tr>
-</table>
-
-<br>
-
-<p><i>Format: name1:ip1,name2:ip2,name3:ip3</i></p>
-
-<br><br>
-
-<h3>Auto-Discovery</h3>
-
-<p>Click the <b>Discover</b> button above to automatically find WLED devices on your network.</p>
-
-<br><br>
-
-<hr>
-
-<br>
-
-<table cellpadding="5">
-  <tr>
-    <td><a href="https://github.com/superflytnt/udi-wled-poly" target="_blank">Source Code</a></td>
-    <td style="color: #666;">—</td>
-    <td>View and contribute on GitHub</td>
-  </tr>
-  <tr>
-    <td><a href="https://github.com/superflytnt/udi-wled-poly#readme" target="_blank">Documentation</a></td>
-    <td style="color: #666;">—</td>
-    <td>Setup guide and command reference</td>
-  </tr>
-  <tr>
-    <td><a href="https://github.com/superflytnt/udi-wled-poly/issues" target="_blank">Report Issue</a></td>
-    <td style="color: #666;">—</td>
-    <td>Bug reports and feature requests</td>
-  </tr>
-  <tr>
-    <td><a href="https://kno.wled.ge/" target="_blank">WLED Docs</a></td>
-    <td style="color: #666;">—</td>
-    <td>Official WLED documentation</td>
-  </tr>
-</table>
-'''
-        self.poly.setCustomParamsDoc(html)
+        self.poly.setCustomParamsDoc(_CONFIG_DOCS_HTML)
     
     def _parse_devices(self, devices_str: str):
         """
@@ -195,28 +352,35 @@ class Controller(udi_interface.Node):
         Args:
             devices_str: Comma-separated list of name:ip pairs
         """
-        if not devices_str:
-            return
-        
+        # Parse the whole string first, then only add the devices not yet managed.
+        # Entries dropped from the string keep their nodes, as they always have
+        wanted = self._parse_entries(devices_str)
+        for address, (name, ip) in wanted.items():
+            if address not in self._devices:
+                self._add_wled_device(name, ip, address=address)
+        self._configured = {address: ip for address, (name, ip) in wanted.items()}
+    
+    @classmethod
+    def _parse_entries(cls, devices_str: str) -> Dict[str, Tuple[str, str]]:
+        """Parse a "name:ip,..." string into {address: (name, ip)}"""
+        wanted = {}
         for device_entry in devices_str.split(','):
-            device_entry = device_entry.strip()
-            if not device_entry:
-                continue
-            
-            if ':' in device_entry:
-                parts = device_entry.split(':')
-                name = parts[0].strip()
-                ip = parts[1].strip()
-                
-                if name and ip:
-                    self._add_wled_device(name, ip)
+            name, sep, rest = device_entry.partition(':')
+            if sep:
+                # Like the original split(':'), the IP is the second field and
+                # anything after it (e.g. a port) is ignored
+                ip = rest.partition(':')[0]
             else:
                 # Just an IP address, use IP as name
-                ip = device_entry.strip()
-                name = ip.replace('.', '_')
-                self._add_wled_device(name, ip)
+                ip = name
+                name = ip.strip().replace('.', '_')
+            name, ip = name.strip(), ip.strip()
+            
+            if name and ip:
+                wanted[cls._mk_address(name)] = (name, ip)
+        return wanted
     
-    def _add_wled_device(self, name: str, ip: str, port: int = 80):
+    def _add_wled_device(self, name: str, ip: str, port: int = 80, address: Optional[str] = None):
         """
         Add a WLED device node.
         
@@ -224,22 +388,26 @@ class Controller(udi_interface.Node):
             name: Device name
             ip: IP address
             port: HTTP port (default 80)
+            address: Node address, if the caller already derived it from name
         """
-        # Create node address from name (max 14 chars, lowercase, alphanumeric + _)
-        address = name.lower().replace(' ', '_').replace('.', '_')
-        address = ''.join(c for c in address if c.isalnum() or c == '_')[:14]
+        if address is None:
+            address = self._mk_address(name)
         
-        # Check if already exists
-        if address in self._devices:
-            LOGGER.warning(f"Device {name} ({address}) already exists")
-            return
+        # Reserve the address, then build the node (which talks to the
+        # device) outside the lock so several devices can be added at once
+        with self._devices_lock:
+            if address in self._devices or address in self._adding:
+                LOGGER.warning(f"Device {name} ({address}) already exists")
+                return
+            if (ip, port) in self._hosts:
+                LOGGER.warning(f"Device {name}: {ip}:{port} is already managed under another name")
+                return
+            self._adding.add(address)
+            self._hosts.add((ip, port))
         
         LOGGER.info(f"Adding WLED device: {name} at {ip}:{port} (address: {address})")
         
         try:
-            # Import here to avoid circular imports
-            from nodes.wled_device import WLEDDevice
-            
             # Create the device node
             node = WLEDDevice(
                 self.poly,
@@ -251,18 +419,52 @@ class Controller(udi_interface.Node):
                 self._wled_api
             )
             
-            self._devices[address] = {
-                'name': name,
-                'ip': ip,
-                'port': port,
-                'node': node
-            }
+            entry = DeviceEntry(name, ip, port, node)
+            with self._devices_lock:
+                self._devices[address] = entry
+                self._nodes = self._nodes + (node,)
+                self._entries = self._entries + (entry,)
             
             # Update device count
             self._update_device_count()
             
         except Exception as e:
             LOGGER.error(f"Failed to add device {name}: {e}")
+            with self._devices_lock:
+                self._hosts.discard((ip, port))
+        finally:
+            with self._devices_lock:
+                self._adding.discard(address)
+    
+    def _on_mdns_device(self, device: Dict[str, Any]):
+        """mDNS browser callback - runs on the WLED event loop, so defer the node creation"""
+        self._pool.submit(self._add_discovered_device, device)
+    
+    def _add_discovered_device(self, device: Dict[str, Any]):
+        """Add a device found by the mDNS browser unless it is already managed"""
+        ip = device.get('ip')
+        name = device.get('name', '').replace('.local', '').replace('.', '_') or ip.replace('.', '_')
+        
+        if self._mk_address(name) in self._devices or (ip, 80) in self._hosts:
+            return
+        first = not self._devices
+        LOGGER.info(f"mDNS: Found new WLED device {name} at {ip}")
+        self._add_wled_device(name, ip)
+        if self._mk_address(name) not in self._devices:
+            return
+        self._schedule_save_devices()
+        
+        # The effect list comes from the first device, so build it now
+        if first:
+            self._rebuild_effects_nls()
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _mk_address(name: str) -> str:
+        """Create node address from name (max 14 chars, lowercase, alphanumeric + _)"""
+        # str.isalnum() keeps non-ASCII letters, as existing node addresses expect
+        address = name.lower().translate(_ADDR_TABLE)
+        return ''.join(c for c in address if c.isalnum() or c == '_')[:14]
     
     def _remove_wled_device(self, address: str):
         """
@@ -271,15 +473,28 @@ class Controller(udi_interface.Node):
         Args:
             address: Node address
         """
-        if address in self._devices:
-            device = self._devices.pop(address)
-            self.poly.delNode(address)
-            LOGGER.info(f"Removed WLED device: {device['name']}")
-            self._update_device_count()
+        with self._devices_lock:
+            device = self._devices.pop(address, None)
+            if device is None:
+                return
+            self._hosts.discard((device.ip, device.port))
+            node = device.node
+            self._nodes = tuple(n for n in self._nodes if n is not node)
+            self._entries = tuple(e for e in self._entries if e is not device)
+        
+        if self._wled_api is not None:
+            self._wled_api.remove_device(device.ip, device.port)
+        elif node and node._device:
+            node._device.close()
+        self.poly.delNode(address)
+        LOGGER.info(f"Removed WLED device: {device.name}")
+        self._update_device_count()
     
     def _update_device_count(self):
         """Update device count status"""
         count = len(self._devices)
+        if self.getDriver('GV0') == count:
+            return
         self.setDriver('GV0', count)
         LOGGER.debug(f"Device count: {count}")
     
@@ -294,6 +509,10 @@ class Controller(udi_interface.Node):
         if self._config_done:
             self._load_config()
     
+    def data_handler(self, data):
+        """Handle custom data (saved discovered devices) from PG3"""
+        self._custom_data.load(data)
+    
     def node_added(self, node):
         """Called when a node is added"""
         LOGGER.debug(f"Node added: {node.get('address')}")
@@ -307,29 +526,81 @@ class Controller(udi_interface.Node):
         """
         if polltype == 'shortPoll':
             LOGGER.debug("Short poll - updating device status")
-            self._poll_devices()
+            self._poll_devices(backoff=True)
         elif polltype == 'longPoll':
             LOGGER.debug("Long poll - full device sync")
             self._poll_devices(full_sync=True)
     
-    def _poll_devices(self, full_sync: bool = False):
+    def _poll_devices(self, full_sync: bool = False, backoff: bool = False):
         """
         Poll all devices for status.
         
         Args:
             full_sync: If True, do a full sync including effects/palettes
+            backoff: If True (the shortPoll handler), skip devices whose
+                turn hasn't come round yet (see _reschedule). Other polls,
+                such as the refresh after a bulk command, cover every device
+                and put it back on every short poll.
         """
-        for address, device_info in self._devices.items():
-            node = device_info.get('node')
-            if node:
+        # Devices with a live WebSocket feed already push their changes to
+        # the drivers, so short polls only need to cover the others
+        entries = self._entries
+        if not full_sync:
+            entries = [entry for entry in entries if not self._is_pushing(entry.node)]
+        if backoff:
+            due = []
+            with self._schedule_lock:
+                for entry in entries:
+                    if entry.skip:
+                        entry.skip -= 1
+                    else:
+                        due.append(entry)
+            entries = due
+        
+        futures = {self._pool.submit(entry.update_long if full_sync else entry.update_short): entry
+                   for entry in entries}
+        try:
+            for future in as_completed(futures, timeout=self._poll_timeout):
+                entry = futures[future]
                 try:
-                    node.update_status(full_sync=full_sync)
+                    future.result()
                 except Exception as e:
-                    LOGGER.error(f"Failed to poll device {address}: {e}")
+                    LOGGER.error(f"Failed to poll device {entry.node.address}: {e}")
+                with self._schedule_lock:
+                    self._reschedule(entry, reset=not (backoff or full_sync))
+        except FuturesTimeout:
+            # A hung device keeps its worker, but doesn't hold up the stats below
+            slow = [entry.node.address for future, entry in futures.items() if not future.done()]
+            LOGGER.warning(f"Poll timed out after {self._poll_timeout:.0f}s waiting for: {', '.join(slow)}")
         
         # Update controller stats after polling all devices
         self.update_stats()
     
+    @staticmethod
+    def _reschedule(entry: DeviceEntry, reset: bool = False):
+        """
+        Pick how many short polls to skip before polling a device again.
+        
+        Each poll that finds the same state as the last doubles the gap, up
+        to _MAX_POLL_EVERY; any change (including going on/offline) or a
+        reset drops it back to every short poll, so active devices are
+        followed closely and idle ones cost a fraction of the requests.
+        Long polls still cover every device. Call with _schedule_lock held.
+        """
+        device = entry.node._device
+        seen = (device.online, device.state) if device else None
+        if seen == entry.seen and not reset:
+            entry.poll_every = min(entry.poll_every * 2, _MAX_POLL_EVERY)
+        else:
+            entry.poll_every = 1
+            entry.seen = seen
+        entry.skip = entry.poll_every - 1
+    
+    @staticmethod
+    def _is_pushing(node) -> bool:
+        """Check if a device node is receiving WebSocket state pushes"""
+        return bool(node._device and node._device.ws_connected)
+    
     def update_stats(self):
         """
         Update controller statistics from all devices.
@@ -341,8 +612,7 @@ class Controller(udi_interface.Node):
         total_brightness = 0
         brightness_count = 0
         
-        for address, device_info in self._devices.items():
-            node = device_info.get('node')
+        for node in self._nodes:
             if node and node._device:
                 if node._device.online:
                     online_count += 1
@@ -363,16 +633,32 @@ class Controller(udi_interface.Node):
         if brightness_count > 0:
             avg_brightness = int(total_brightness / brightness_count)
         
-        # Update controller stats
-        self.setDriver('GV2', online_count)
-        self.setDriver('GV3', devices_on)
-        self.setDriver('GV4', total_leds)
-        self.setDriver('GV5', avg_brightness)
-        self.setDriver('GV6', self._last_effect)
+        # Update controller stats (one report for all of them)
+        self._set_drivers({
+            'GV2': online_count,
+            'GV3': devices_on,
+            'GV4': total_leds,
+            'GV5': avg_brightness,
+            'GV6': self._last_effect,
+        })
     
     def stop(self):
         """Stop the controller node"""
         LOGGER.info("Stopping WLED Controller...")
+        if self._wled_api:
+            self._wled_api.stop_browser()
+            self._wled_api.close()
+        with self._profile_lock:
+            if self._profile_reload_timer is not None:
+                self._profile_reload_timer.cancel()
+                self._profile_reload_timer = None
+        # Don't lose devices the browser found just before shutdown
+        with self._save_lock:
+            save_timer, self._save_timer = self._save_timer, None
+        if save_timer is not None:
+            save_timer.cancel()
+            self._save_devices()
+        self._pool.shutdown(wait=False, cancel_futures=True)
         LOGGER.info("WLED Controller stopped")
     
     def query(self):
@@ -398,9 +684,9 @@ class Controller(udi_interface.Node):
             if devices:
                 LOGGER.info(f"Discovered {len(devices)} WLED device(s)")
                 
-                # Build list of discovered devices for notice
-                device_names = []
-                new_devices = 0
+                # Discovered devices keyed by address, so repeat answers
+                # collapse into one entry (the first answer wins)
+                discovered: Dict[str, Tuple[str, str]] = {}
                 
                 for device in devices:
                     ip = device.get('ip')
@@ -411,39 +697,41 @@ class Controller(udi_interface.Node):
                     
                     LOGGER.info(f"Found WLED device: {name} at {ip}")
                     
-                    # Check if this is a new device
-                    address = name.lower().replace(' ', '_').replace('.', '_')
-                    address = ''.join(c for c in address if c.isalnum() or c == '_')[:14]
-                    
-                    if address not in self._devices:
-                        new_devices += 1
-                    
-                    device_names.append(f"{name} ({ip})")
-                    self._add_wled_device(name, ip)
+                    discovered.setdefault(self._mk_address(name), (name, ip))
+                
+                # Only devices not already managed (by address or by IP) need a node
+                new = discovered.keys() - self._devices.keys()
+                new = {address for address in new if (discovered[address][1], 80) not in self._hosts}
+                new_devices = len(new)
+                
+                # Node creation contacts each device, so add them concurrently
+                list(self._pool.map(lambda address: self._add_wled_device(*discovered[address], address=address),
+                                    new))
+                if new:
+                    self._save_devices()
                 
                 # Show notice with results
-                import datetime
-                timestamp = datetime.datetime.now().strftime("%m/%d %H:%M")
+                timestamp = datetime.datetime.now().strftime(_TS_FMT)
                 
                 # Format device list nicely
-                device_list = ', '.join(device_names)
+                device_list = ', '.join(f"{name} ({ip})" for name, ip in discovered.values())
                 
                 if new_devices > 0:
-                    self.poly.Notices['discovery'] = f"Discovery complete ({timestamp}) - Found {len(devices)} device(s), {new_devices} new: {device_list}"
+                    self.poly.Notices['discovery'] = f"Discovery complete ({timestamp}) - Found {len(discovered)} device(s), {new_devices} new: {device_list}"
                 else:
-                    self.poly.Notices['discovery'] = f"Discovery complete ({timestamp}) - {len(devices)} device(s) already configured"
+                    self.poly.Notices['discovery'] = f"Discovery complete ({timestamp}) - {len(discovered)} device(s) already configured"
             else:
                 LOGGER.info("No WLED devices found via discovery")
                 LOGGER.info("Try adding devices manually via configuration")
-                import datetime
-                timestamp = datetime.datetime.now().strftime("%m/%d %H:%M")
+                timestamp = datetime.datetime.now().strftime(_TS_FMT)
                 self.poly.Notices['discovery'] = f"Discovery complete ({timestamp}) - No WLED devices found. Add devices manually in Configuration."
                 
         except Exception as e:
             LOGGER.error(f"Discovery failed: {e}")
-            import datetime
-            timestamp = datetime.datetime.now().strftime("%m/%d %H:%M")
+            timestamp = datetime.datetime.now().strftime(_TS_FMT)
             self.poly.Notices['discovery_error'] = f"Discovery failed ({timestamp}) - {e}"
+        
+        self._flush_profile()
     
     def rebuild_presets(self, command=None):
         """
@@ -456,21 +744,26 @@ class Controller(udi_interface.Node):
         LOGGER.info("Fetching presets from all WLED devices...")
         LOGGER.info("Note: Each device has unique presets. Check WLED web UI for preset names.")
         
-        # Have each device fetch and log its own presets
-        for address, device_info in self._devices.items():
-            node = device_info.get('node')
-            if node:
-                try:
-                    node._fetch_presets()
-                    if node._available_presets:
-                        LOGGER.info(f"Device {address} presets:")
-                        for preset_id in sorted(node._available_presets.keys()):
-                            LOGGER.info(f"  {preset_id}: {node._available_presets[preset_id]}")
-                except Exception as e:
-                    LOGGER.warning(f"Failed to get presets from {address}: {e}")
+        # Have each device fetch its own presets concurrently, then log them in order
+        def fetch(node):
+            try:
+                node._fetch_presets()
+                return None
+            except Exception as e:
+                return e
+        
+        nodes = self._nodes
+        for node, error in zip(nodes, self._pool.map(fetch, nodes)):
+            if error is not None:
+                LOGGER.warning(f"Failed to get presets from {node.address}: {error}")
+            elif node._available_presets:
+                LOGGER.info(f"Device {node.address} presets:")
+                for preset_id in sorted(node._available_presets.keys()):
+                    LOGGER.info(f"  {preset_id}: {node._available_presets[preset_id]}")
         
         # Also rebuild effects with metadata
         self._rebuild_effects_nls()
+        self._flush_profile()
     
     def _rebuild_effects_nls(self):
         """
@@ -483,16 +776,15 @@ class Controller(udi_interface.Node):
         
         # Get metadata from first available device
         effect_metadata = None
-        for address, device_info in self._devices.items():
-            node = device_info.get('node')
+        for node in self._nodes:
             if node and hasattr(node, '_device') and node._device:
                 try:
                     effect_metadata = node._device.get_effect_metadata()
                     if effect_metadata:
-                        LOGGER.info(f"Got effect metadata from {address}")
+                        LOGGER.info(f"Got effect metadata from {node.address}")
                         break
                 except Exception as e:
-                    LOGGER.warning(f"Failed to get effect metadata from {address}: {e}")
+                    LOGGER.warning(f"Failed to get effect metadata from {node.address}: {e}")
         
         if not effect_metadata:
             LOGGER.warning("Could not get effect metadata from any device")
@@ -507,27 +799,22 @@ class Controller(udi_interface.Node):
         Args:
             effect_metadata: Dict mapping effect ID to metadata dict
         """
-        import os
+        profile_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'profile', 'nls')
+        nls_file = os.path.join(profile_dir, 'en_us.txt')
+        
+        # Skip the read/rewrite when the same metadata was already written,
+        # either earlier in this run or (per the file's signature line) before a restart
+        sig = hashlib.blake2b(repr(sorted(effect_metadata.items())).encode(), digest_size=16).hexdigest()
+        if self._effects_sig is None:
+            self._effects_sig = self._read_effects_sig(nls_file)
+        if sig == self._effects_sig:
+            LOGGER.debug("Effect metadata unchanged - NLS file left as is")
+            return
         
         try:
-            profile_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'profile', 'nls')
-            nls_file = os.path.join(profile_dir, 'en_us.txt')
-            
-            # Read existing NLS content
-            existing_lines = []
-            if os.path.exists(nls_file):
-                with open(nls_file, 'r') as f:
-                    existing_lines = f.readlines()
-            
-            # Remove old effect entries (keep only non-EFFECT lines)
-            filtered_lines = [line for line in existing_lines 
-                             if not line.startswith('EFFECT-')]
-            # Also remove the effect header
-            filtered_lines = [line for line in filtered_lines 
-                             if 'Effect Names' not in line and 'WLED effects' not in line]
-            
             # Build new effect entries with metadata
-            effect_lines = ["\n# Effect Names (WLED effects with type indicators)\n"]
+            effect_lines = ["\n# Effect Names (WLED effects with type indicators)\n",
+                            f"{_EFFECT_SIG_PREFIX}{sig}\n"]
             for effect_id in sorted(effect_metadata.keys()):
                 meta = effect_metadata[effect_id]
                 name = meta.get('name', f'Effect {effect_id}')
@@ -555,16 +842,80 @@ class Controller(udi_interface.Node):
                 else:
                     effect_lines.append(f"EFFECT-{effect_id} = {effect_id}: {name}\n")
             
-            # Write updated NLS file
-            with open(nls_file, 'w') as f:
-                f.writelines(filtered_lines)
-                f.writelines(effect_lines)
+            # Assemble the new file in memory: the existing lines minus the
+            # old effect entries and header, followed by the new effect block
+            skip = _EFFECT_NLS_RE.match
+            buf = io.StringIO()
+            if os.path.exists(nls_file):
+                with open(nls_file, 'r') as src:
+                    buf.writelines(line for line in src if not skip(line))
+            buf.writelines(effect_lines)
+            
+            # Write it to a temp file in one go, then swap it in atomically
+            with tempfile.NamedTemporaryFile('w', dir=profile_dir, suffix='.tmp', delete=False) as dst:
+                try:
+                    dst.write(buf.getvalue())
+                except BaseException:
+                    dst.close()
+                    os.unlink(dst.name)
+                    raise
+            os.chmod(dst.name, 0o644)  # NamedTemporaryFile creates it 0600
+            os.replace(dst.name, nls_file)
             
+            self._effects_sig = sig
             LOGGER.info(f"Updated NLS file with {len(effect_metadata)} effect names and metadata")
+            self._schedule_profile_reload()
             
         except Exception as e:
             LOGGER.error(f"Failed to update effect NLS: {e}")
     
+    @staticmethod
+    def _read_effects_sig(nls_file: str) -> str:
+        """Return the effect signature recorded in the NLS file, or '' if none."""
+        try:
+            with open(nls_file, 'r') as f:
+                for line in f:
+                    if line.startswith(_EFFECT_SIG_PREFIX):
+                        return line[len(_EFFECT_SIG_PREFIX):].strip()
+        except OSError:
+            pass
+        return ''
+    
+    def _schedule_profile_reload(self, delay: float = 2.0):
+        """
+        Upload the profile to the ISY once NLS changes settle.
+        
+        updateProfile() makes the ISY reload the whole profile, so calls
+        within the delay re-arm one timer instead of each triggering a reload.
+        start(), discover() and rebuild_presets() flush a pending reload
+        when they finish (see _flush_profile).
+        """
+        with self._profile_lock:
+            if self._profile_reload_timer is not None:
+                self._profile_reload_timer.cancel()
+            self._profile_reload_timer = threading.Timer(delay, self._reload_profile)
+            self._profile_reload_timer.daemon = True
+            self._profile_reload_timer.start()
+    
+    def _reload_profile(self):
+        """Timer callback for _schedule_profile_reload"""
+        with self._profile_lock:
+            # A flush or re-arm while this was firing already took over
+            if self._profile_reload_timer is not threading.current_thread():
+                return
+            self._profile_reload_timer = None
+        LOGGER.info("Uploading updated profile to the ISY")
+        self.poly.updateProfile()
+    
+    def _flush_profile(self):
+        """Upload a pending profile change now instead of when its timer fires"""
+        with self._profile_lock:
+            timer, self._profile_reload_timer = self._profile_reload_timer, None
+        if timer is None:
+            return
+        timer.cancel()
+        LOGGER.info("Uploading updated profile to the ISY")
+        self.poly.updateProfile()
     
     def cmd_all_on(self, command=None):
         """Turn all WLED devices on, optionally with brightness level"""
@@ -576,8 +927,7 @@ class Controller(udi_interface.Node):
         else:
             LOGGER.info("Turning ALL devices ON")
         
-        for address, device_info in self._devices.items():
-            node = device_info.get('node')
+        for node in self._nodes:
             if node and node._device:
                 try:
                     node._device.set_power(True)
@@ -585,7 +935,7 @@ class Controller(udi_interface.Node):
                         bri_val = int((brightness / 100) * 255)
                         node._device.set_brightness(bri_val)
                 except Exception as e:
-                    LOGGER.error(f"Failed to turn on {address}: {e}")
+                    LOGGER.error(f"Failed to turn on {node.address}: {e}")
         
         # Update all device statuses and controller stats
         self._poll_devices()
@@ -594,15 +944,14 @@ class Controller(udi_interface.Node):
         """Brighten all WLED devices by ~10%"""
         LOGGER.info("Brightening ALL devices")
         
-        for address, device_info in self._devices.items():
-            node = device_info.get('node')
+        for node in self._nodes:
             if node and node._device and node._device.state:
                 try:
                     current = node._device.state.brightness
                     new_bri = min(255, current + 25)  # +10% roughly
                     node._device.set_brightness(new_bri)
                 except Exception as e:
-                    LOGGER.error(f"Failed to brighten {address}: {e}")
+                    LOGGER.error(f"Failed to brighten {node.address}: {e}")
         
         # Update all device statuses
         self._poll_devices()
@@ -611,15 +960,14 @@ class Controller(udi_interface.Node):
         """Dim all WLED devices by ~10%"""
         LOGGER.info("Dimming ALL devices")
         
-        for address, device_info in self._devices.items():
-            node = device_info.get('node')
+        for node in self._nodes:
             if node and node._device and node._device.state:
                 try:
                     current = node._device.state.brightness
                     new_bri = max(0, current - 25)  # -10% roughly
                     node._device.set_brightness(new_bri)
                 except Exception as e:
-                    LOGGER.error(f"Failed to dim {address}: {e}")
+                    LOGGER.error(f"Failed to dim {node.address}: {e}")
         
         # Update all device statuses
         self._poll_devices()
@@ -628,13 +976,12 @@ class Controller(udi_interface.Node):
         """Turn all WLED devices off"""
         LOGGER.info("Turning ALL devices OFF")
         
-        for address, device_info in self._devices.items():
-            node = device_info.get('node')
+        for node in self._nodes:
             if node and node._device:
                 try:
                     node._device.set_power(False)
                 except Exception as e:
-                    LOGGER.error(f"Failed to turn off {address}: {e}")
+                    LOGGER.error(f"Failed to turn off {node.address}: {e}")
         
         # Update all device statuses and controller stats
         self._poll_devices()
@@ -647,13 +994,12 @@ class Controller(udi_interface.Node):
         # Convert percentage to 0-255
         bri_val = int((brightness / 100) * 255)
         
-        for address, device_info in self._devices.items():
-            node = device_info.get('node')
+        for node in self._nodes:
             if node and node._device:
                 try:
                     node._device.set_brightness(bri_val)
                 except Exception as e:
-                    LOGGER.error(f"Failed to set brightness on {address}: {e}")
+                    LOGGER.error(f"Failed to set brightness on {node.address}: {e}")
         
         # Update all device statuses
         self._poll_devices()
@@ -666,13 +1012,12 @@ class Controller(udi_interface.Node):
         # Track the last effect set via controller
         self._last_effect = effect_id
         
-        for address, device_info in self._devices.items():
-            node = device_info.get('node')
+        for node in self._nodes:
             if node and node._device:
                 try:
                     node._device.set_effect(effect_id)
                 except Exception as e:
-                    LOGGER.error(f"Failed to set effect on {address}: {e}")
+                    LOGGER.error(f"Failed to set effect on {node.address}: {e}")
         
         # Update all device statuses
         self._poll_devices()
@@ -0,0 +1,21 @@
+"""
+Node Helpers
+
+Behaviour shared by the WLED node classes.
+"""
+
+from typing import Any, Dict
+
+
+class DriverBatchMixin:
+    """Mixin for udi_interface.Node subclasses that set drivers in groups"""
+    
+    def _set_drivers(self, drivers: Dict[str, Any]):
+        """Set several drivers, sending them to the ISY in one report if any changed"""
+        changed = False
+        for driver, value in drivers.items():
+            if self.getDriver(driver) != value:
+                self.setDriver(driver, value, report=False)
+                changed = True
+        if changed:
+            self.reportDrivers()
@@ -9,10 +9,12 @@ import udi_interface
 import logging
 from typing import Optional, Any
 
+from nodes.node_mixins import DriverBatchMixin
+
 LOGGER = udi_interface.LOGGER
 
 
-class WLEDDevice(udi_interface.Node):
+class WLEDDevice(DriverBatchMixin, udi_interface.Node):
     """
     WLED Device Node
     
@@ -88,20 +90,38 @@ class WLEDDevice(udi_interface.Node):
         # Presets cache
         self._available_presets = {}
         
+        # (online, state) the drivers were last set from. The API keeps the
+        # same state object while /json/state is unchanged, so an identity
+        # check is enough to skip rebuilding drivers on idle polls
+        self._reported: Optional[tuple] = None
+        
         # Initialize device connection
         self._init_device()
         
         # Add node to polyglot
         polyglot.addNode(self)
         
-        # Initial status update and preset fetch
+        # Push updates from the WebSocket feed straight to the drivers
+        self._device.on_update = self._on_push
+        
+        # Initial status update (also loads presets)
         self.update_status(full_sync=True)
-        self._fetch_presets()
     
     def _init_device(self):
         """Initialize WLED device connection"""
-        from lib.wled_api import WLEDDevice as WLEDApiDevice
-        self._device = WLEDApiDevice(self._ip, self._port)
+        if self._wled_api is not None:
+            # Shares the API's keep-alive session with every other device
+            self._device = self._wled_api.add_device(self._ip, self._port)
+        else:
+            from lib.wled_api import WLEDDevice as WLEDApiDevice
+            self._device = WLEDApiDevice(self._ip, self._port)
+        
+        # Merge commands that arrive together (e.g. DON with a level, or a
+        # dragged slider) into one POST; on_update refreshes the drivers after
+        self._device.batch_window = 0.05
+        
+        # Subscribe to state pushes so short polls can be served from cache
+        self._device.start_ws()
     
     def _fetch_presets(self):
         """Fetch available presets from device"""
@@ -127,42 +147,65 @@ class WLEDDevice(udi_interface.Node):
         
         try:
             if full_sync:
-                # Get all data
-                success = self._device.get_all()
+                # Get all data in one /json fetch; presets are only re-read
+                # when the device reports that presets.json changed
+                success = self._device.refresh(include_presets=True)
+                if self._device.presets:
+                    self._available_presets = self._device.presets
             else:
                 # Just get state
                 self._device.get_state()
                 success = self._device.online
             
+            self._update_drivers()
+            
+        except Exception as e:
+            LOGGER.error(f"Failed to update status for {self.name}: {e}")
+            self.setDriver('GV7', 0)  # Mark offline
+            self._reported = None
+    
+    def _on_push(self):
+        """Handle a state push from the device's WebSocket feed"""
+        self._update_drivers()
+        self._notify_controller()
+    
+    def _update_drivers(self):
+        """Set drivers from the device's cached state"""
+        online = self._device.online
+        state = self._device.state
+        reported = self._reported
+        if reported is not None and reported[0] == online and reported[1] is state:
+            return
+        
+        try:
             # Update online status
-            self.setDriver('GV7', 1 if self._device.online else 0)
+            drivers = {'GV7': 1 if self._device.online else 0}
             
             if self._device.online and self._device.state:
                 state = self._device.state
                 
                 # Update power
-                self.setDriver('ST', 1 if state.on else 0)
+                drivers['ST'] = 1 if state.on else 0
                 
                 # Update brightness (convert 0-255 to 0-100%)
                 brightness_pct = int((state.brightness / 255) * 100)
-                self.setDriver('GV0', brightness_pct)
+                drivers['GV0'] = brightness_pct
                 
                 # Update effect
-                self.setDriver('GV1', state.effect)
+                drivers['GV1'] = state.effect
                 
                 # Update palette
-                self.setDriver('GV2', state.palette)
+                drivers['GV2'] = state.palette
                 
                 # Update preset
-                preset = state.preset if state.preset >= 0 else 0
-                self.setDriver('GV3', preset)
+                drivers['GV3'] = state.preset if state.preset >= 0 else 0
                 
                 # Update color (separate RGB)
                 color = state.primary_color
                 if len(color) >= 3:
-                    self.setDriver('GV4', color[0])  # Red
-                    self.setDriver('GV5', color[1])  # Green
-                    self.setDriver('GV6', color[2])  # Blue
+                    drivers['GV4'] = color[0]  # Red
+                    drivers['GV5'] = color[1]  # Green
+                    drivers['GV6'] = color[2]  # Blue
                 
                 # Update speed and intensity (from main segment)
                 speed_pct = 50
@@ -171,20 +214,17 @@ class WLEDDevice(udi_interface.Node):
                     seg = state.segments[state.main_segment] if state.main_segment < len(state.segments) else state.segments[0]
                     speed_pct = int((seg.speed / 255) * 100)
                     intensity_pct = int((seg.intensity / 255) * 100)
-                    self.setDriver('GV8', speed_pct)
-                    self.setDriver('GV9', intensity_pct)
+                    drivers['GV8'] = speed_pct
+                    drivers['GV9'] = intensity_pct
                 
                 # Update transition time
-                self.setDriver('GV10', state.transition)
+                drivers['GV10'] = state.transition
                 
                 # Update live override status
-                self.setDriver('GV11', 1 if state.live else 0)
+                drivers['GV11'] = 1 if state.live else 0
                 
                 # Update nightlight (combined: 0=off, else duration in minutes)
-                if state.nightlight_on:
-                    self.setDriver('GV12', state.nightlight_duration)
-                else:
-                    self.setDriver('GV12', 0)
+                drivers['GV12'] = state.nightlight_duration if state.nightlight_on else 0
                 
                 # Update sync (combined: 0=off, 1=send, 2=recv, 3=both)
                 sync_val = 0
@@ -194,13 +234,17 @@ class WLEDDevice(udi_interface.Node):
                     sync_val = 1  # Send only
                 elif state.sync_receive:
                     sync_val = 2  # Receive only
-                self.setDriver('GV13', sync_val)
+                drivers['GV13'] = sync_val
                 
                 LOGGER.debug(f"{self.name}: Power={state.on}, Brightness={brightness_pct}%, Effect={state.effect}, Speed={speed_pct}%")
             
+            self._set_drivers(drivers)
+            self._reported = (online, state)
+            
         except Exception as e:
             LOGGER.error(f"Failed to update status for {self.name}: {e}")
             self.setDriver('GV7', 0)  # Mark offline
+            self._reported = None
     
     def query(self, command=None):
         """Query device status"""
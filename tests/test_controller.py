@@ -0,0 +1,29 @@
+"""Tests for nodes.controller helpers"""
+
+import pytest
+
+pytest.importorskip('udi_interface')
+
+from nodes.controller import Controller
+
+
+def _baseline_address(name):
+    """Address derivation as the original controller wrote it"""
+    address = name.lower().replace(' ', '_').replace('.', '_')
+    return ''.join(c for c in address if c.isalnum() or c == '_')[:14]
+
+
+@pytest.mark.parametrize('name', [
+    'Kitchen',
+    'WLED Kitchen.local',
+    'a-b_c D',
+    'Küche',
+    'Ünïcode  Strip 12345678',
+    'x' * 30,
+])
+def test_mk_address_matches_baseline(name):
+    assert Controller._mk_address(name) == _baseline_address(name)
+
+
+def test_mk_address_keeps_non_ascii_letters():
+    assert Controller._mk_address('Küche') == 'küche'
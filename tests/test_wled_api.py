@@ -0,0 +1,212 @@
+"""Tests for the lib.wled_api client logic (no device or udi_interface needed)"""
+
+import io
+import json
+import sys
+
+import pytest
+
+pytest.importorskip('requests')
+
+from lib.wled_api import WLEDDevice, WLEDState, _merge_state
+
+
+class FakeResponse:
+    """Just enough of requests.Response for WLEDDevice"""
+
+    def __init__(self, body=None, status_code=200, headers=None):
+        self.content = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.raw = io.BytesIO(self.content)
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """Records requests and answers them from a queue of FakeResponses"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.gets = []
+        self.posts = []
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        self.gets.append((url, headers))
+        return self.responses.pop(0)
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        self.posts.append(json.loads(data))
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+STATE = {
+    'on': True, 'bri': 128, 'transition': 7,
+    'seg': [
+        {'id': 0, 'start': 0, 'stop': 30, 'len': 30, 'on': True, 'bri': 255,
+         'fx': 0, 'sx': 128, 'ix': 128, 'pal': 0, 'col': [[255, 0, 0], [0, 0, 0], [0, 0, 0]]},
+        {'id': 1, 'start': 30, 'stop': 60, 'len': 30, 'on': True, 'bri': 255,
+         'fx': 0, 'sx': 128, 'ix': 128, 'pal': 0, 'col': [[0, 255, 0], [0, 0, 0], [0, 0, 0]]},
+    ],
+}
+
+
+def make_device(*responses, state=None, live=False):
+    device = WLEDDevice('192.0.2.1', session=FakeSession(*responses))
+    if state is not None:
+        device._state = WLEDState.from_json(state)
+    device._ws_connected = live
+    return device
+
+
+# _merge_state
+
+def test_merge_state_later_scalars_win():
+    pending = {}
+    _merge_state(pending, {'on': True, 'bri': 10})
+    _merge_state(pending, {'bri': 20})
+    assert pending == {'on': True, 'bri': 20}
+
+
+def test_merge_state_merges_segments_by_id():
+    pending = {}
+    _merge_state(pending, {'seg': [{'fx': 3}]})
+    _merge_state(pending, {'seg': [{'id': 0, 'pal': 2}, {'id': 1, 'fx': 5}]})
+    _merge_state(pending, {'seg': [{'id': 1, 'fx': 6}]})
+    assert pending == {'seg': [{'id': 0, 'fx': 3, 'pal': 2}, {'id': 1, 'fx': 6}]}
+
+
+# Local state patch after a write
+
+def test_fast_path_write_patches_cached_state():
+    device = make_device(FakeResponse({'success': True}), state=STATE)
+
+    assert device.set_state(seg=[{'id': 1, 'fx': 7, 'col': [[1, 2, 3]]}])
+
+    assert device._session.posts == [{'seg': [{'id': 1, 'fx': 7, 'col': [[1, 2, 3]]}]}]
+    segment = device.state.segments[1]
+    assert segment.effect == 7
+    assert segment.colors == [[1, 2, 3], [0, 0, 0], [0, 0, 0]]
+    assert device.state.segments[0].effect == 0
+
+
+def test_brightness_write_turns_cached_device_on():
+    device = make_device(FakeResponse({'success': True}), state={**STATE, 'on': False})
+
+    assert device.set_state(bri=200)
+
+    assert device._session.posts == [{'bri': 200}]
+    assert device.state.on is True
+    assert device.state.brightness == 200
+
+
+def test_other_writes_ask_for_the_new_state():
+    echoed = {**STATE, 'ps': 3}
+    device = make_device(FakeResponse(echoed), state=STATE)
+
+    assert device.set_state(ps=3)
+
+    assert device._session.posts == [{'ps': 3, 'v': True}]
+
+
+# No-op skip
+
+def test_noop_write_is_not_sent_when_state_is_live():
+    device = make_device(state=STATE, live=True)
+
+    assert device.set_state(on=True, bri=128)
+    assert device.set_state(seg=[{'id': 0, 'fx': 0}])
+
+    assert device._session.posts == []
+
+
+def test_noop_check_needs_a_live_state():
+    device = make_device(FakeResponse({'success': True}), state=STATE, live=False)
+
+    assert device.set_state(on=True)
+
+    assert device._session.posts == [{'on': True}]
+
+
+def test_brightness_write_to_off_device_is_never_a_noop():
+    off = {**STATE, 'on': False}
+    device = make_device(FakeResponse({'success': True}), state=off, live=True)
+
+    assert device.set_state(bri=128)
+
+    assert device._session.posts == [{'bri': 128}]
+    assert device.state.on is True
+
+
+# Conditional GET and parse cache
+
+def test_unchanged_body_is_not_parsed_again():
+    device = make_device(FakeResponse(STATE), FakeResponse(STATE))
+
+    first = device.get_state()
+    second = device.get_state()
+
+    assert second is first
+    assert len(device._session.gets) == 2
+
+
+def test_etag_is_sent_and_304_keeps_cached_state():
+    device = make_device(FakeResponse(STATE, headers={'ETag': '"a"'}),
+                         FakeResponse(b'', status_code=304))
+
+    first = device.get_state()
+    second = device.get_state()
+
+    assert second is first
+    assert device._session.gets[1][1] == {'If-None-Match': '"a"'}
+
+
+def test_parse_cache_reuses_object_for_a_repeated_body():
+    changed = {**STATE, 'bri': 5}
+    device = make_device(FakeResponse(STATE), FakeResponse(changed), FakeResponse(STATE))
+
+    first = device.get_state()
+    second = device.get_state()
+    third = device.get_state()
+
+    assert second.brightness == 5
+    assert third is first
+
+
+def test_write_invalidates_validators():
+    device = make_device(FakeResponse(STATE), FakeResponse({'success': True}),
+                         FakeResponse(STATE))
+
+    device.get_state()
+    device.set_state(bri=10)
+    state = device.get_state()
+
+    assert state.brightness == 128
+
+
+# Presets
+
+PRESETS = {
+    '0': {},
+    '1': {'n': 'Party', 'on': True, 'seg': [{'id': 0, 'n': 'Segment name'}]},
+    '2': {'n': 'Movie'},
+    'x': {'n': 'Not a preset'},
+}
+
+
+def test_presets_without_ijson(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'ijson', None)
+    device = make_device(FakeResponse(PRESETS))
+
+    assert device.get_presets() == {1: 'Party', 2: 'Movie'}
+
+
+def test_presets_streamed_with_ijson():
+    pytest.importorskip('ijson')
+    device = make_device(FakeResponse(PRESETS))
+
+    assert device.get_presets() == {1: 'Party', 2: 'Movie'}
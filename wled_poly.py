@@ -24,6 +24,7 @@ import logging
 
 # Import node classes
 from nodes import Controller
+from lib import WLEDApi
 
 LOGGER = udi_interface.LOGGER
 
@@ -39,6 +40,10 @@ def main():
     LOGGER.info(f"WLED NodeServer v{VERSION} starting...")
     
     try:
+        # Use uvloop for the WLED I/O loop when it is installed
+        if WLEDApi.install_uvloop():
+            LOGGER.info("Using uvloop for WLED I/O")
+        
         # Initialize Polyglot interface
         polyglot = udi_interface.Interface([])
         polyglot.start(VERSION)